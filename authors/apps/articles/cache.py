@@ -0,0 +1,71 @@
+"""
+Response cache for single articles.
+
+The part of an article payload that is the same for every viewer is
+cached under its slug and a version stamp. Changes to the article, its
+tags, ratings, likes or author profile give the slug a new version (see
+`signals`), so stale payloads are never read again and simply expire.
+Versions are changed right away and again once the transaction commits,
+so a payload built from uncommitted data can't outlive the commit.
+
+Only Django's cache API is used, so any backend configured as
+`ARTICLE_CACHE` works, the local-memory default included.
+"""
+from hashlib import md5
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+VERSION_KEY = 'article-version:{}'
+
+
+def _cache():
+    return caches[settings.ARTICLE_CACHE]
+
+
+def article_version(slug):
+    """Return the current version stamp of the article at `slug`."""
+    cache = _cache()
+    key = VERSION_KEY.format(slug)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid4().hex, None)
+        version = cache.get(key)
+    return version
+
+
+def payload_key(request, slug):
+    """Return the cache key of the article payload served for `request`.
+    Share links are absolute, so the origin is part of the key."""
+    origin = '{}://{}'.format(request.scheme, request.get_host())
+    return 'article:' + md5(repr(
+        (origin, slug, article_version(slug))).encode('utf-8')).hexdigest()
+
+
+def get_or_build(request, slug, build):
+    """Return the cached entry for the article at `slug`, calling `build`
+    to make it on a miss. Nothing is cached when `build` returns None."""
+    cache = _cache()
+    key = payload_key(request, slug)
+    entry = cache.get(key)
+    if entry is None:
+        entry = build()
+        if entry is not None:
+            cache.set(key, entry, settings.ARTICLE_CACHE_TIMEOUT)
+    return entry
+
+
+def invalidate_articles(slugs):
+    """Give the articles at `slugs` new versions, now and on commit."""
+    slugs = list(slugs)
+    if not slugs:
+        return
+
+    def bump():
+        _cache().set_many(
+            {VERSION_KEY.format(slug): uuid4().hex for slug in slugs}, None)
+
+    bump()
+    transaction.on_commit(bump)
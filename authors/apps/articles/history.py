@@ -0,0 +1,61 @@
+"""
+Comment edit history.
+
+A `Snapshot` is taken each time an edit changes a comment's body. Rather
+than a full copy, each snapshot stores a delta that rebuilds its body from
+the next newer version: the newer snapshot's body, or the comment's
+current body for the newest snapshot. Taking a snapshot rewrites the
+previous newest one against the new body, and the oldest snapshots past
+`COMMENT_SNAPSHOT_RETENTION` are deleted, which no other snapshot depends
+on.
+
+A delta is a JSON list of `[start, end]` word ranges copied from the newer
+version and strings inserted between them. Snapshots saved before deltas
+were introduced keep their full `body` until the
+`compact_comment_history` command rewrites them.
+"""
+import json
+import re
+from difflib import SequenceMatcher
+
+# Words and the whitespace between them, which join back to the text.
+TOKEN_RE = re.compile(r'\s+|\S+')
+
+
+def make_delta(newer, older):
+    """Return the delta that rebuilds `older` from `newer`."""
+    newer_tokens = TOKEN_RE.findall(newer)
+    older_tokens = TOKEN_RE.findall(older)
+    matcher = SequenceMatcher(None, newer_tokens, older_tokens,
+                              autojunk=False)
+    operations = []
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == 'equal':
+            operations.append([i1, i2])
+        elif j2 > j1:
+            operations.append(''.join(older_tokens[j1:j2]))
+    return json.dumps(operations, separators=(',', ':'))
+
+
+def apply_delta(newer, delta):
+    """Return the text `delta` rebuilds from `newer`."""
+    newer_tokens = TOKEN_RE.findall(newer)
+    parts = []
+    for operation in json.loads(delta):
+        if isinstance(operation, str):
+            parts.append(operation)
+        else:
+            start, end = operation
+            parts.extend(newer_tokens[start:end])
+    return ''.join(parts)
+
+
+def rebuild_bodies(current_body, snapshots):
+    """Fill in the full `body` of each of `snapshots`, given newest first,
+    starting from the comment's `current_body`. Return the snapshots."""
+    newer = current_body
+    for snapshot in snapshots:
+        if snapshot.body is None:
+            snapshot.body = apply_delta(newer, snapshot.delta)
+        newer = snapshot.body
+    return snapshots
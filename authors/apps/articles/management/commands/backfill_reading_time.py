@@ -0,0 +1,49 @@
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from ...models import Article
+
+
+class Command(BaseCommand):
+    """Fill in `Article.reading_minutes` for rows saved before the column
+    existed.
+
+    Articles are read in primary key order, a batch at a time, with only
+    the body loaded. Each batch is written with one UPDATE per distinct
+    reading time, so rerunning the command after an interruption picks up
+    where it stopped.
+    """
+    help = 'Backfill the stored reading time of articles.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help='Number of articles read per batch.')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        pending = Article.objects.filter(
+            reading_minutes__isnull=True).order_by('pk')
+
+        last_pk = 0
+        updated = 0
+        while True:
+            batch = list(pending.filter(pk__gt=last_pk).values_list(
+                'pk', 'body')[:batch_size])
+            if not batch:
+                break
+            by_minutes = defaultdict(list)
+            for pk, body in batch:
+                by_minutes[Article.compute_reading_minutes(body)].append(pk)
+            with transaction.atomic():
+                for minutes, pks in by_minutes.items():
+                    updated += Article.objects.filter(
+                        pk__in=pks, reading_minutes__isnull=True).update(
+                            reading_minutes=minutes)
+            last_pk = batch[-1][0]
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Backfilled reading time for '
+                               f'{updated} articles.'))
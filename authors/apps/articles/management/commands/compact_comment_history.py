@@ -0,0 +1,82 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F
+
+from ... import history
+from ...models import Snapshot, ThreadedComment
+
+
+class Command(BaseCommand):
+    """Rewrite the edit history of comments into the compact format.
+
+    Comments that have snapshots are read in primary key order, a batch at
+    a time. For each one, snapshots that repeat the version before them
+    (taken by saves that didn't change the body) are dropped along with
+    those past `COMMENT_SNAPSHOT_RETENTION`, and the rest are stored as
+    deltas. Rerunning the command leaves compacted history unchanged.
+    """
+    help = 'Compact the stored edit history of comments.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=200,
+            help='Number of comments read per batch.')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        commented = ThreadedComment.objects.filter(
+            snapshots__isnull=False).distinct().order_by('pk')
+
+        last_pk = 0
+        compacted = 0
+        deleted = 0
+        while True:
+            batch = list(commented.filter(pk__gt=last_pk).only(
+                'pk', 'body')[:batch_size])
+            if not batch:
+                break
+            for comment in batch:
+                with transaction.atomic():
+                    deleted += self.compact(comment)
+                compacted += 1
+            last_pk = batch[-1].pk
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Compacted the history of {compacted} '
+                               f'comments, deleting {deleted} snapshots.'))
+
+    def compact(self, comment):
+        """Compact the history of `comment` and return the number of
+        snapshots deleted."""
+        snapshots = history.rebuild_bodies(comment.body, list(
+            Snapshot.objects.select_for_update().filter(comment=comment)))
+
+        kept = []
+        repeats = []
+        # Oldest first, so each is compared with the version before it.
+        for snapshot in reversed(snapshots):
+            if kept and snapshot.body == kept[-1].body:
+                repeats.append(snapshot.pk)
+            else:
+                kept.append(snapshot)
+        kept.reverse()
+        stale = [snapshot.pk for snapshot in
+                 kept[settings.COMMENT_SNAPSHOT_RETENTION or len(kept):]]
+        kept = kept[:len(kept) - len(stale)]
+
+        if repeats or stale:
+            Snapshot.objects.filter(pk__in=repeats + stale).delete()
+        if repeats:
+            # Saves that didn't change the body weren't edits.
+            ThreadedComment.objects.filter(
+                pk=comment.pk, edit_count__gte=len(repeats)).update(
+                    edit_count=F('edit_count') - len(repeats))
+
+        newer = comment.body
+        for snapshot in kept:
+            delta = history.make_delta(newer, snapshot.body)
+            Snapshot.objects.filter(pk=snapshot.pk).update(
+                body=None, delta=delta)
+            newer = snapshot.body
+        return len(repeats) + len(stale)
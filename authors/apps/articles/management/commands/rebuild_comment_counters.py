@@ -0,0 +1,55 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from ...models import Snapshot, ThreadedComment
+
+
+class Command(BaseCommand):
+    """Recompute `ThreadedComment.reply_count` and
+    `ThreadedComment.edit_count` from the replies and snapshots tables.
+
+    Each batch of comments is rebuilt with a single UPDATE driven by
+    correlated subqueries, so no replies or snapshots are loaded into
+    Python. Edits whose snapshots were pruned by the retention limit are
+    no longer counted.
+    """
+    help = 'Rebuild the denormalized comment reply and edit counters.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Number of comments updated per statement.')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        replies = ThreadedComment.objects.filter(
+            comment=OuterRef('pk'), is_active=True).order_by().values(
+                'comment')
+        snapshots = Snapshot.objects.filter(
+            comment=OuterRef('pk')).order_by().values('comment')
+        reply_count = Subquery(
+            replies.annotate(total=Count('id')).values('total'),
+            output_field=IntegerField())
+        edit_count = Subquery(
+            snapshots.annotate(total=Count('id')).values('total'),
+            output_field=IntegerField())
+
+        last_pk = 0
+        updated = 0
+        while True:
+            pks = list(ThreadedComment.objects.filter(
+                pk__gt=last_pk).order_by('pk').values_list(
+                    'pk', flat=True)[:batch_size])
+            if not pks:
+                break
+            with transaction.atomic():
+                updated += ThreadedComment.objects.filter(
+                    pk__gte=pks[0], pk__lte=pks[-1]).update(
+                        reply_count=Coalesce(reply_count, 0),
+                        edit_count=Coalesce(edit_count, 0))
+            last_pk = pks[-1]
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Rebuilt counters for {updated} comments.'))
@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from ...models import Article, Like
+
+
+class Command(BaseCommand):
+    """Recompute `Article.like_count` and `Article.dislike_count` from the
+    `Like` table.
+
+    Each batch of articles is rebuilt with a single UPDATE driven by
+    correlated subqueries, so no like rows are loaded into Python.
+    """
+    help = 'Rebuild the denormalized article like and dislike counts.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Number of articles updated per statement.')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+
+        def count(is_like):
+            likes = Like.objects.filter(
+                article_id=OuterRef('pk'), is_like=is_like).order_by().values(
+                    'article_id')
+            return Coalesce(Subquery(
+                likes.annotate(total=Count('id')).values('total'),
+                output_field=IntegerField()), 0)
+
+        last_pk = 0
+        updated = 0
+        while True:
+            pks = list(Article.objects.filter(pk__gt=last_pk).order_by(
+                'pk').values_list('pk', flat=True)[:batch_size])
+            if not pks:
+                break
+            with transaction.atomic():
+                updated += Article.objects.filter(
+                    pk__gte=pks[0], pk__lte=pks[-1]).update(
+                        like_count=count(True),
+                        dislike_count=count(False))
+            last_pk = pks[-1]
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Rebuilt like counts for {updated} articles.'))
@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+from ...models import Article, Rating
+
+
+class Command(BaseCommand):
+    """Recompute `Article.rating_count` and `Article.rating_sum` from the
+    `Rating` table.
+
+    Each batch of articles is rebuilt with a single UPDATE driven by
+    correlated subqueries, so no rating rows are loaded into Python.
+    """
+    help = 'Rebuild the denormalized article rating aggregates.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Number of articles updated per statement.')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        ratings = Rating.objects.filter(
+            article=OuterRef('pk')).order_by().values('article')
+        count = Subquery(ratings.annotate(total=Count('id')).values('total'),
+                         output_field=IntegerField())
+        total = Subquery(ratings.annotate(total=Sum('value')).values('total'),
+                         output_field=IntegerField())
+
+        last_pk = 0
+        updated = 0
+        while True:
+            pks = list(Article.objects.filter(pk__gt=last_pk).order_by(
+                'pk').values_list('pk', flat=True)[:batch_size])
+            if not pks:
+                break
+            with transaction.atomic():
+                updated += Article.objects.filter(
+                    pk__gte=pks[0], pk__lte=pks[-1]).update(
+                        rating_count=Coalesce(count, 0),
+                        rating_sum=Coalesce(total, 0))
+            last_pk = pks[-1]
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Rebuilt rating aggregates for '
+                               f'{updated} articles.'))
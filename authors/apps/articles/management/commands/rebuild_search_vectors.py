@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from ...models import Article
+from ...search import article_search_vector, install_search_indexes
+
+
+class Command(BaseCommand):
+    """Recompute `Article.search_vector` for every article and make sure
+    the search indexes exist.
+
+    Each batch of articles is rebuilt with a single UPDATE, so no article
+    text is loaded into Python. Only PostgreSQL stores search vectors.
+    """
+    help = 'Rebuild the full-text search vectors of articles.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Number of articles updated per statement.')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            self.stdout.write('Search vectors are only stored on '
+                              'PostgreSQL, nothing to do.')
+            return
+        install_search_indexes(connection)
+
+        batch_size = options['batch_size']
+        last_pk = 0
+        updated = 0
+        while True:
+            pks = list(Article.objects.filter(pk__gt=last_pk).order_by(
+                'pk').values_list('pk', flat=True)[:batch_size])
+            if not pks:
+                break
+            with transaction.atomic():
+                updated += Article.objects.filter(
+                    pk__gte=pks[0], pk__lte=pks[-1]).update(
+                        search_vector=article_search_vector())
+            last_pk = pks[-1]
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Rebuilt search vectors for '
+                               f'{updated} articles.'))
@@ -1,4 +1,135 @@
-from django.db.models import QuerySet
+from collections import defaultdict
+
+from django.conf import settings
+from django.contrib.postgres.search import SearchRank
+from django.db import IntegrityError, connections, transaction
+from django.db.models import F, QuerySet, Window
+from django.db.models.functions import RowNumber
+from django.utils.text import slugify
+
+from . import history
+from . import search as article_search
+
+
+class ArticleQuerySet(QuerySet):
+    """Custom querysets for the Article model."""
+
+    def published(self):
+        """Return only published and activated articles."""
+        return self.filter(published=True, activated=True)
+
+    def for_feed(self):
+        """Return articles with everything `TheArticleSerializer` reads
+        already joined or prefetched so that serializing a page costs a
+        fixed number of queries.
+        """
+        return self.select_related('author__user').prefetch_related(
+            'tags').defer('search_vector')
+
+    def search(self, field, text):
+        """Return the articles whose `field` matches `text`, where `field`
+        is one of 'title', 'description', 'body', 'author' or 'tags'.
+
+        Everything, tag matches included, is filtered in a single query so
+        the result can be paginated in the database.
+        """
+        ordering = ('-created_at', '-id')
+        if field == 'author':
+            matches = self.filter(author__user__username__icontains=text)
+        elif field == 'tags':
+            tagged = self.model.tags.through.objects.filter(
+                tag__tag__icontains=text).values('article_id')
+            matches = self.filter(pk__in=tagged)
+        elif field not in article_search.FIELD_WEIGHTS:
+            return self.none()
+        elif article_search.fulltext_enabled(connections[self.db]):
+            query = article_search.field_query(field, text)
+            if query is None:
+                return self.none()
+            matches = self.filter(search_vector=query).annotate(
+                rank=SearchRank(F('search_vector'), query))
+            ordering = ('-rank',) + ordering
+        else:
+            matches = self.filter(**{field + '__icontains': text})
+        return matches.order_by(*ordering)
+
+
+class LikeQuerySet(QuerySet):
+    """Custom querysets for the Like model."""
+
+    def toggle(self, user, article, is_like):
+        """Like or dislike `article` as `user` in one transaction, and
+        update the article's counts to match.
+
+        Reacting the same way twice removes the like, reacting the other
+        way switches it. Return the like, or None once it was removed.
+        """
+        with transaction.atomic():
+            like, created = self.select_for_update().get_or_create(
+                user_id=user, article_id=article,
+                defaults={'is_like': is_like})
+            if created:
+                article.update_like_counts(*like.count_deltas())
+            elif like.is_like == is_like:
+                like.delete()
+                article.update_like_counts(*like.count_deltas(-1))
+                like = None
+            else:
+                like.is_like = is_like
+                like.save(update_fields=['is_like'])
+                switched = 1 if is_like else -1
+                article.update_like_counts(switched, -switched)
+        return like
+
+
+class SavedArticleQuerySet(QuerySet):
+    """Custom querysets for the models that save articles for a user, such
+    as Favorite and Bookmark."""
+
+    def for_user(self, user):
+        """Return the rows saved by `user`."""
+        return self.filter(user_id=user)
+
+    def with_articles(self):
+        """Return rows with their articles joined and prefetched the way
+        `ArticleQuerySet.for_feed` loads them."""
+        return self.select_related('article_id__author__user').prefetch_related(
+            'article_id__tags').defer('article_id__search_vector')
+
+
+class TagQuerySet(QuerySet):
+    """Custom querysets for the Tag model."""
+
+    def get_or_create_all(self, names):
+        """Return the tags for `names`, creating the missing ones, in a
+        constant number of queries however many names are given."""
+        names_by_slug = {}
+        for name in names:
+            names_by_slug.setdefault(slugify(name), name)
+        if not names_by_slug:
+            return []
+
+        tags = {tag.slug: tag
+                for tag in self.filter(slug__in=names_by_slug)}
+        missing = [self.model(tag=name, slug=slug)
+                   for slug, name in names_by_slug.items()
+                   if slug not in tags]
+        if missing:
+            try:
+                with transaction.atomic():
+                    self.bulk_create(missing)
+            except IntegrityError:
+                # A concurrent request created some of these first.
+                for tag in missing:
+                    self.get_or_create(slug=tag.slug,
+                                       defaults={'tag': tag.tag})
+            tags = {tag.slug: tag
+                    for tag in self.filter(slug__in=names_by_slug)}
+        return [tags[slug] for slug in names_by_slug]
+
+    def delete_orphans(self):
+        """Delete the tags that no article uses any more."""
+        return self.filter(articles__isnull=True).delete()
 
 
 class CommentQuerySet(QuerySet):
@@ -23,3 +154,90 @@ class CommentQuerySet(QuerySet):
     def for_comment(self, comment):
         """Return active comments for a given article."""
         return self._active().filter(comment=comment)
+
+    def for_output(self, edit_history=True):
+        """Return comments with everything the comment output serializers
+        read joined or prefetched. Without `edit_history` no snapshots are
+        loaded at all.
+        """
+        comments = self.select_related('author__user')
+        if edit_history:
+            return comments.prefetch_related('snapshots')
+        return comments
+
+    def attach_replies(self, comments, limit, edit_history=True):
+        """Attach the newest `limit` active replies of each of `comments`
+        as `replies`, and set `has_more_replies` on the comments that have
+        more.
+
+        The replies to show are picked from their ids, numbered per
+        comment in the database, then only those are loaded. At most
+        `limit + 1` ids and `limit` full replies are fetched per comment,
+        however long its thread.
+        """
+        ordering = ('-created_at', '-id')
+        counts = defaultdict(int)
+        picked = []
+        reply_ids = []
+        # Django can't filter on a window function, so the numbered
+        # replies are filtered in an outer query. Only `limit + 1` rows
+        # per comment come back, the last telling whether there are more.
+        numbered = self._active().filter(comment__in=comments).annotate(
+            reply_position=Window(
+                RowNumber(), partition_by=[F('comment_id')],
+                order_by=[F('created_at').desc(), F('id').desc()])
+        ).values_list('pk', 'comment_id', 'reply_position')
+        if comments:
+            sql, params = numbered.query.sql_with_params()
+            with connections[self.db].cursor() as cursor:
+                cursor.execute(
+                    f'SELECT * FROM ({sql}) numbered '
+                    f'WHERE numbered.reply_position <= %s',
+                    params + (limit + 1,))
+                reply_ids = cursor.fetchall()
+        for pk, comment_id, position in reply_ids:
+            counts[comment_id] += 1
+            if position <= limit:
+                picked.append(pk)
+
+        replies = defaultdict(list)
+        if picked:
+            for reply in self.filter(pk__in=picked).for_output(
+                    edit_history).order_by(*ordering):
+                replies[reply.comment_id].append(reply)
+        for comment in comments:
+            comment.replies = replies[comment.pk]
+            comment.has_more_replies = counts[comment.pk] > limit
+        return comments
+
+
+class SnapshotQuerySet(QuerySet):
+    """Custom querysets for the Snapshot model."""
+
+    def record(self, comment, previous_body):
+        """Add the current body of `comment` to its edit history, given
+        the body it had before the edit. Call inside a transaction."""
+        newest = self.select_for_update().filter(comment=comment).first()
+        if newest is not None:
+            if newest.body is None:
+                newest.body = history.apply_delta(previous_body,
+                                                  newest.delta)
+            newest.delta = history.make_delta(comment.body, newest.body)
+            newest.body = None
+            newest.save(update_fields=['body', 'delta'])
+        self.create(comment=comment,
+                    delta=history.make_delta(comment.body, comment.body))
+        self.prune(comment)
+
+    def prune(self, comment):
+        """Delete the oldest snapshots of `comment` past the retention
+        limit. A limit of 0 keeps them all."""
+        keep = settings.COMMENT_SNAPSHOT_RETENTION
+        if not keep:
+            return 0
+        stale = list(self.filter(comment=comment).values_list(
+            'pk', flat=True)[keep:])
+        if not stale:
+            return 0
+        deleted, _ = self.filter(pk__in=stale).delete()
+        return deleted
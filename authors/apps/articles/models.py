@@ -1,17 +1,17 @@
 import readtime
 
 from django.conf import settings
-from django.db import models
+from django.contrib.postgres.search import SearchVectorField
+from django.db import IntegrityError, connection, models, transaction
 from django.utils.functional import cached_property
 from django.utils.translation import ugettext_lazy as _
 
 from authors.apps.core.abstract_models import TimeStamped
 from authors.apps.profiles.models import Profile
 
-from . import managers
+from . import history, managers, search
 from .utils import generate_unique_slug
-from django.db.models import Avg
-from cloudinary import CloudinaryImage
+from django.db.models import F
 from django.utils.text import slugify
 
 
@@ -32,31 +32,132 @@ class Article(models.Model):
         Profile, related_name="articles",
         on_delete=models.CASCADE
     )
-
-    objects = models.Manager()
+    # Denormalized from `Rating` so the average can be read without a
+    # query. Kept up to date by `update_rating_aggregate` and rebuilt by
+    # the `rebuild_rating_aggregates` management command.
+    rating_count = models.PositiveIntegerField(default=0)
+    rating_sum = models.PositiveIntegerField(default=0)
+    # Denormalized from `Like`, kept up to date by `update_like_counts` and
+    # rebuilt by the `rebuild_like_counts` management command.
+    like_count = models.PositiveIntegerField(default=0)
+    dislike_count = models.PositiveIntegerField(default=0)
+    # Computed from `body` on save, backfilled for older rows by the
+    # `backfill_reading_time` management command.
+    reading_minutes = models.PositiveIntegerField(null=True, blank=True)
+    # Weighted full-text vector of the title, description and body, kept
+    # up to date on save on PostgreSQL. Older rows are filled in by the
+    # `rebuild_search_vectors` management command.
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = managers.ArticleQuerySet.as_manager()
+
+    # Counter columns that are only ever written with `F()` updates.
+    AGGREGATE_FIELDS = ('rating_count', 'rating_sum', 'like_count',
+                        'dislike_count')
+    # Times a save retries with a new slug after losing a race for one.
+    SLUG_ATTEMPTS = 5
 
     def __str__(self):
         return self.title
 
+    # Body as loaded from the database, used to tell whether it changed.
+    _loaded_body = None
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if 'body' in field_names:
+            instance._loaded_body = values[field_names.index('body')]
+        return instance
+
     def save(self, *args, **kwargs):
         '''Saves all the changes of model article'''
         if not self.slug:
-            self.slug = generate_unique_slug(self, "title", "slug")
+            self._save_with_unique_slug(*args, **kwargs)
+            return
+        if self._body_changed():
+            self.reading_minutes = self.compute_reading_minutes(self.body)
+            self._loaded_body = self.body
+        if not self._state.adding and 'update_fields' not in kwargs:
+            # Don't write back possibly stale counters over concurrent
+            # `F()` updates, and don't load deferred fields just to save
+            # them unchanged.
+            excluded = set(self.AGGREGATE_FIELDS) | self.get_deferred_fields()
+            excluded.update((self._meta.pk.name, 'search_vector'))
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if field.name not in excluded
+            ]
         super().save(*args, **kwargs)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or set(update_fields) & set(
+                search.FIELD_WEIGHTS):
+            self.update_search_vector()
+
+    def update_search_vector(self):
+        '''Recompute the stored search vector from the saved row.'''
+        if connection.vendor != 'postgresql':
+            return
+        Article.objects.filter(pk=self.pk).update(
+            search_vector=search.article_search_vector())
+
+    def _save_with_unique_slug(self, *args, **kwargs):
+        '''Allocate a slug and save. If a concurrent save takes the same
+        slug first, the unique constraint fails and a fresh slug is
+        allocated.'''
+        for attempt in range(self.SLUG_ATTEMPTS):
+            self.slug = generate_unique_slug(self, "title", "slug")
+            try:
+                with transaction.atomic():
+                    self.save(*args, **kwargs)
+                return
+            except IntegrityError:
+                slug_taken = Article.objects.filter(slug=self.slug).exists()
+                self.slug = None
+                if not slug_taken or attempt == self.SLUG_ATTEMPTS - 1:
+                    raise
+
+    def _body_changed(self):
+        if 'body' in self.get_deferred_fields():
+            return False
+        if self._state.adding or self.reading_minutes is None:
+            return True
+        return self.body != self._loaded_body
+
+    @staticmethod
+    def compute_reading_minutes(body):
+        return readtime.of_text(str(body)).minutes
 
     def get_reading_time(self):
-        result = readtime.of_text(str(self.body))
-        reading_time = result.minutes
+        reading_time = self.reading_minutes
+        if reading_time is None:
+            # Not backfilled yet.
+            reading_time = self.compute_reading_minutes(self.body)
         unit = " minutes"
 
         return str(reading_time) + unit
 
     def get_average_rating(self):
-        if Rating.objects.all().count() > 0:
-            rating = Rating.objects.all().aggregate(Avg('value'))
-            return round(rating['value__avg'], 1)
+        if self.rating_count > 0:
+            return round(self.rating_sum / self.rating_count, 1)
         return "This article has not been rated."
 
+    def update_rating_aggregate(self, value_delta, count_delta=0):
+        '''Apply a rating change to the denormalized rating columns. Call
+        inside the transaction that writes the `Rating` row.'''
+        Article.objects.filter(pk=self.pk).update(
+            rating_sum=F('rating_sum') + value_delta,
+            rating_count=F('rating_count') + count_delta
+        )
+
+    def update_like_counts(self, likes=0, dislikes=0):
+        '''Apply a change to the denormalized like and dislike counts. Call
+        inside the transaction that writes the `Like` row.'''
+        Article.objects.filter(pk=self.pk).update(
+            like_count=F('like_count') + likes,
+            dislike_count=F('dislike_count') + dislikes
+        )
+
     class Meta:
         ordering = ["-created_at", "-updated_at"]
 
@@ -69,6 +170,18 @@ class Like(models.Model):
         Article, on_delete=models.CASCADE, related_name='likes')
     is_like = models.BooleanField()
 
+    objects = managers.LikeQuerySet.as_manager()
+
+    class Meta:
+        unique_together = (('user_id', 'article_id'),)
+
+    def count_deltas(self, sign=1):
+        """Return the (likes, dislikes) change this like makes to its
+        article's counts when added, or removed with `sign=-1`."""
+        if self.is_like:
+            return sign, 0
+        return 0, sign
+
 
 class ThreadedComment(TimeStamped):
     """Comment model for articles and other comments."""
@@ -80,25 +193,71 @@ class ThreadedComment(TimeStamped):
                                 on_delete=models.CASCADE)
     body = models.TextField(_("Body"))
     is_active = models.BooleanField(default=True)
+    # Denormalized counts of active replies and of snapshots, only ever
+    # written with `F()` updates by `update_counters` and rebuilt by the
+    # `rebuild_comment_counters` management command.
+    reply_count = models.PositiveIntegerField(default=0)
+    edit_count = models.PositiveIntegerField(default=0)
 
     objects = models.Manager()
     active_objects = managers.CommentQuerySet.as_manager()
 
+    COUNTER_FIELDS = ('reply_count', 'edit_count')
+
     class Meta:
         ordering = ('-created_at',)
 
     def __str__(self):
         return f'{self.author}: {self.body:10}...'
 
+    # The body before the last save, read by the snapshot signal handler.
+    previous_body = None
+
+    def save(self, *args, **kwargs):
+        if self._state.adding:
+            super().save(*args, **kwargs)
+            return
+        if kwargs.get('update_fields') is None:
+            # Don't write back possibly stale counters over concurrent
+            # `F()` updates.
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not (field.primary_key or field.name in self.COUNTER_FIELDS)
+            ]
+        with transaction.atomic():
+            if 'body' in kwargs['update_fields']:
+                # The body replaced is read from the locked row, so that
+                # of concurrent edits each is recorded in the history
+                # against the body the one before it saved.
+                locked = ThreadedComment.objects.select_for_update()
+                self.previous_body = locked.filter(pk=self.pk).values_list(
+                    'body', flat=True).first()
+            else:
+                self.previous_body = self.body
+            super().save(*args, **kwargs)
+
+    def update_counters(self, replies=0, edits=0):
+        """Apply a change to the denormalized counter columns."""
+        ThreadedComment.objects.filter(pk=self.pk).update(
+            reply_count=F('reply_count') + replies,
+            edit_count=F('edit_count') + edits
+        )
+
     def soft_delete(self):
         """Make a soft deletion by changing the is_active field."""
-        self.is_active = False
-        self.save()
+        self._set_active(False)
 
     def undo_soft_deletion(self):
         """Undo a soft deleteion."""
-        self.is_active = True
-        self.save()
+        self._set_active(True)
+
+    def _set_active(self, is_active):
+        changed = self.is_active != is_active
+        with transaction.atomic():
+            self.is_active = is_active
+            self.save()
+            if changed and self.comment_id:
+                self.comment.update_counters(replies=1 if is_active else -1)
 
     def for_comment(self):
         """Check whether this comment is for another comment."""
@@ -107,20 +266,39 @@ class ThreadedComment(TimeStamped):
         return False
 
     @cached_property
+    def replies(self):
+        """Return the active comments on this comment. Set directly by
+        `attach_replies` when a page of comments is loaded."""
+        return ThreadedComment.active_objects.for_comment(self)
+
+    @property
+    def edit_history(self):
+        """Return the snapshots, newest first, with their full bodies."""
+        return history.rebuild_bodies(self.body, list(self.snapshots.all()))
+
+    @property
     def edited(self):
         """Return whether the comment has been edited."""
-        return self.snapshots.all().exists()
+        return self.edit_count > 0
 
 
 class Snapshot(models.Model):
-    """Model to take snapshots of comments everytime they are edited."""
+    """Model to take snapshots of comments everytime they are edited.
+
+    Snapshots store a delta against the next newer version of the comment
+    rather than the full body, see `history`.
+    """
     timestamp = models.DateTimeField(auto_now_add=True)
     comment = models.ForeignKey('ThreadedComment', related_name='snapshots',
                                 on_delete=models.CASCADE)
-    body = models.TextField(_("Body"))
+    # Full copy of the body, only kept by snapshots that predate `delta`.
+    body = models.TextField(_("Body"), null=True)
+    delta = models.TextField(null=True)
+
+    objects = managers.SnapshotQuerySet.as_manager()
 
     class Meta:
-        ordering = ('-timestamp',)
+        ordering = ('-timestamp', '-id')
         verbose_name = _("Comment Snapshot")
         verbose_name_plural = _("Comment Snapshots")
 
@@ -133,6 +311,11 @@ class Favorite(models.Model):
     article_id = models.ForeignKey(
         Article, on_delete=models.CASCADE, related_name='favorites')
 
+    objects = managers.SavedArticleQuerySet.as_manager()
+
+    class Meta:
+        unique_together = (('user_id', 'article_id'),)
+
 
 class Rating(models.Model):
     """This class creates an article rating model."""
@@ -151,15 +334,16 @@ class Rating(models.Model):
     review = models.TextField(null=True, blank=True)
     created = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        unique_together = (('user', 'article'),)
+
     def get_username(self):
         """This method gets the username of the user rating an article."""
         return self.user.username
 
     def get_image(self):
         """This method gets the image of the user rating an article."""
-        image_url = CloudinaryImage(str(self.user.profile.image)).build_url(
-            width=100, height=150, crop='fill')
-        return image_url
+        return self.user.profile.get_cloudinary_url()
 
     def __str__(self):
         return "This is rating no: " + str(self.id)
@@ -177,60 +361,36 @@ class Tag(models.Model):
     def __str__(self):
         return self.slug
 
-    objects = models.Manager()
-
-    def _create_tag(self, tag_name):
-        '''
-        This method checks if the tag exists and returns the tag object
-        else it creates a new tag object and returns it.
-        '''
-        found = Tag.objects.filter(slug=slugify(tag_name))
-        if len(found) < 1:
-            Tag.objects.create(tag=tag_name)
-        return Tag.objects.filter(slug=slugify(tag_name)).first()
+    objects = managers.TagQuerySet.as_manager()
 
     def _remove_tags_without_articles(self, tag_name):
         '''This method takes a tag name and checks if the tag has
         associated articles and if not it deletes the tag from the
         database in order to save on database space.
         '''
-        found = Tag.objects.filter(slug=slugify(tag_name))
-        if found and len(found) > 0:
-            the_tag = Tag.objects.filter(slug=slugify(tag_name)).first()
-            its_articles = the_tag.articles.all()
-            if len(its_articles) < 1:
-                the_tag.delete()
-                return True
-        return False
+        deleted, _ = Tag.objects.filter(
+            slug=slugify(tag_name)).delete_orphans()
+        return deleted > 0
 
     def _update_article_tags(self, instance, new_tag_list):
         '''This method is used to update the tags of an
-        article and do general tag mainenance.'''
-        old_tags = instance.tags.all()
-        old_tag_slugs = [tag.slug for tag in old_tags]
-        new_tag_slugs = [slugify(tag) for tag in new_tag_list]
-        # Check for items in the old list that are not in the new
-        # list and remove them.
-        tags_to_remove = list(set(old_tag_slugs) - set(new_tag_slugs))
-        remove_tag_objects = [
-            tag for tag in old_tags if (
-                tag.slug in tags_to_remove
-            )
-        ]
-        for item in remove_tag_objects:
-            # Remove tag from article
-            instance.tags.remove(item)
-            # Check if tag has any other article else delete the tag.
-            self._remove_tags_without_articles(item.tag)
-        new_slugs = list(set(new_tag_slugs) - set(old_tag_slugs))
-        tags_to_add = [tag for tag in new_tag_list if(
-            slugify(tag) in new_slugs
-        )]
-        for item in tags_to_add:
-            # Create tag if tag does not exist
-            the_tag = self._create_tag(item)
-            # Add the tag to the article instance.
-            instance.tags.add(the_tag)
+        article and do general tag mainenance. Every step works on the
+        whole set of tags at once.'''
+        old_tags = list(instance.tags.all())
+        new_tags = Tag.objects.get_or_create_all(new_tag_list)
+        new_tag_ids = {tag.pk for tag in new_tags}
+        old_tag_ids = {tag.pk for tag in old_tags}
+
+        tags_to_remove = [tag for tag in old_tags
+                          if tag.pk not in new_tag_ids]
+        tags_to_add = [tag for tag in new_tags if tag.pk not in old_tag_ids]
+        if tags_to_remove:
+            instance.tags.remove(*tags_to_remove)
+            # Delete the removed tags no other article uses.
+            Tag.objects.filter(
+                pk__in=[tag.pk for tag in tags_to_remove]).delete_orphans()
+        if tags_to_add:
+            instance.tags.add(*tags_to_add)
         return True
 
 
@@ -242,7 +402,10 @@ class Bookmark(models.Model):
     article_id = models.ForeignKey(
         Article, on_delete=models.CASCADE, related_name='bookmarks')
 
+    objects = managers.SavedArticleQuerySet.as_manager()
+
     class Meta:
+        unique_together = (('user_id', 'article_id'),)
         verbose_name = _("Article bookmark")
         verbose_name_plural = _("Article bookmarks")
 
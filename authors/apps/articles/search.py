@@ -0,0 +1,97 @@
+"""
+Article search.
+
+On PostgreSQL every article stores a weighted `tsvector` of its title (A),
+description (B) and body (C) in `Article.search_vector`, refreshed when
+the article is saved and GIN indexed. A search for one of those fields
+matches the words of the search string as prefixes restricted to that
+field's weight, and results are ranked.
+
+With `ARTICLE_SEARCH_MODE = 'trigram'`, or on any other database, the
+search falls back to case-insensitive substring matching, which pg_trgm
+GIN indexes serve on PostgreSQL.
+"""
+import logging
+import re
+
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchVector
+
+logger = logging.getLogger(__name__)
+
+SEARCH_CONFIG = 'english'
+# `tsvector` weight of each searchable article field.
+FIELD_WEIGHTS = {'title': 'A', 'description': 'B', 'body': 'C'}
+
+# Columns searched by substring, indexed with pg_trgm.
+TRIGRAM_COLUMNS = (
+    ('articles_article', 'title'),
+    ('articles_article', 'description'),
+    ('articles_article', 'body'),
+    ('articles_tag', 'tag'),
+    ('authentication_user', 'username'),
+)
+
+
+def fulltext_enabled(connection):
+    """Return True when searches on `connection` use the stored vector."""
+    if connection.vendor != 'postgresql':
+        return False
+    return settings.ARTICLE_SEARCH_MODE == 'fulltext'
+
+
+def article_search_vector():
+    """Return the expression `Article.search_vector` is computed from."""
+    vectors = [SearchVector(field, weight=weight, config=SEARCH_CONFIG)
+               for field, weight in FIELD_WEIGHTS.items()]
+    vector = vectors[0]
+    for other in vectors[1:]:
+        vector = vector + other
+    return vector
+
+
+def to_tsquery_text(text, weight=''):
+    """Turn free text into `to_tsquery` syntax, matching every word as a
+    prefix and only within `weight`. Returns an empty string when the
+    text has no words."""
+    words = re.findall(r'[^\W_]+', text)
+    return ' & '.join(f'{word}:*{weight}' for word in words)
+
+
+class PrefixSearchQuery(SearchQuery):
+    """A `SearchQuery` whose value is already in `to_tsquery` syntax."""
+
+    def as_sql(self, compiler, connection):
+        sql, params = super().as_sql(compiler, connection)
+        return sql.replace('plainto_tsquery', 'to_tsquery', 1), params
+
+
+def field_query(field, text):
+    """Return the query matching `text` in `field`, or None when `text`
+    has nothing to search for."""
+    query_text = to_tsquery_text(text, FIELD_WEIGHTS[field])
+    if not query_text:
+        return None
+    return PrefixSearchQuery(query_text, config=SEARCH_CONFIG)
+
+
+def install_search_indexes(connection):
+    """Create the GIN indexes search relies on. Does nothing unless
+    `connection` is PostgreSQL, and is safe to run repeatedly."""
+    if connection.vendor != 'postgresql':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'CREATE INDEX IF NOT EXISTS articles_article_search_vector_gin '
+            'ON articles_article USING gin (search_vector)')
+        try:
+            cursor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        except Exception:
+            logger.warning('Could not enable pg_trgm; substring searches '
+                           'will not be indexed.')
+            return
+        for table, column in TRIGRAM_COLUMNS:
+            # Django's `icontains` compares `UPPER(column)`.
+            cursor.execute(
+                f'CREATE INDEX IF NOT EXISTS {table}_{column}_trgm '
+                f'ON {table} USING gin (UPPER({column}) gin_trgm_ops)')
@@ -13,6 +13,10 @@ class TheArticleSerializer(serializers.ModelSerializer):
     average_rating = serializers.ReadOnlyField(source='get_average_rating')
     author = ProfileSerializer(read_only=True)
     share_links = serializers.SerializerMethodField()
+    tags = serializers.ListField(
+        child=serializers.CharField(max_length=100),
+        write_only=True, required=False)
+    tagList = serializers.SerializerMethodField()
 
     class Meta:
         model = Article
@@ -20,9 +24,10 @@ class TheArticleSerializer(serializers.ModelSerializer):
             'id', 'title', 'body', 'draft', 'slug',
             'reading_time', 'average_rating', 'tags',
             'editing', 'description', 'published', 'activated',
-            "created_at", "updated_at", 'author', 'share_links',
+            "created_at", "updated_at", 'author', 'share_links', 'tagList',
+            'like_count', 'dislike_count',
         ]
-        read_only_fields = ['slug']
+        read_only_fields = ['slug', 'like_count', 'dislike_count']
 
     def create(self, validated_data):
         '''Create a new Article instance, given the accepted data.'''
@@ -36,10 +41,7 @@ class TheArticleSerializer(serializers.ModelSerializer):
         article_data["author"] = user_profile
         article = Article.objects.create(**article_data)
         if tags_data:
-            for item in tags_data:
-                my_tag = Tag()
-                found = my_tag._create_tag(item)
-                article.tags.add(found)
+            article.tags.add(*Tag.objects.get_or_create_all(tags_data))
         return article
 
     def update(self, instance, validated_data):
@@ -73,6 +75,12 @@ class TheArticleSerializer(serializers.ModelSerializer):
     def get_share_links(self, instance):
         return share_link_generator(instance, self.context['request'])
 
+    def get_tagList(self, instance):
+        '''Return the tag names of an article. Reads from the prefetched
+        `tags` cache when the queryset was built with
+        `prefetch_related('tags')`.'''
+        return [tag.tag for tag in instance.tags.all()]
+
 
 class LikesSerializer(serializers.ModelSerializer):
     """
@@ -82,6 +90,13 @@ class LikesSerializer(serializers.ModelSerializer):
         model = Like
         fields = ('id', 'user_id', 'article_id', 'is_like')
         read_only_fields = ['id']
+        # Duplicates are caught by the unique constraint on save.
+        validators = []
+
+
+class LikeToggleSerializer(serializers.Serializer):
+    """Validates a like or dislike sent to the toggle endpoint."""
+    is_like = serializers.BooleanField()
 
 
 class ArticleCommentInputSerializer(serializers.ModelSerializer):
@@ -107,27 +122,47 @@ class SnapshotSerializer(serializers.ModelSerializer):
         fields = ('id', 'body', 'timestamp')
 
 
-class EmbededCommentOutputSerializer(serializers.ModelSerializer):
+class EditHistoryFieldMixin:
+    """Leave `edit_history` out of the output when the serializer context
+    has `edit_history` set to False, so listings can skip loading
+    snapshots."""
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if not self.context.get('edit_history', True):
+            fields.pop('edit_history')
+        return fields
+
+
+class EmbededCommentOutputSerializer(EditHistoryFieldMixin,
+                                     serializers.ModelSerializer):
     """Seriliazes comment and gives output data."""
     author = ProfileSerializer()
-    edit_history = SnapshotSerializer(many=True, source='snapshots')
+    edit_history = SnapshotSerializer(many=True)
 
     class Meta:
         model = ThreadedComment
-        fields = ('id', 'created_at', 'updated_at', 'edited', 'body', 'author',
-                  'edit_history')
+        fields = ('id', 'created_at', 'updated_at', 'edited', 'edit_count',
+                  'body', 'author', 'edit_history')
 
 
-class ThreadedCommentOutputSerializer(serializers.ModelSerializer):
+class ThreadedCommentOutputSerializer(EditHistoryFieldMixin,
+                                      serializers.ModelSerializer):
     """Seriliazes comment and gives output data."""
     author = ProfileSerializer()
-    comments = EmbededCommentOutputSerializer(many=True)
-    edit_history = SnapshotSerializer(many=True, source='snapshots')
+    comments = EmbededCommentOutputSerializer(many=True, source='replies')
+    more_comments = serializers.SerializerMethodField()
+    edit_history = SnapshotSerializer(many=True)
 
     class Meta:
         model = ThreadedComment
-        fields = ('id', 'created_at', 'updated_at', 'edited', 'body', 'author',
-                  'edit_history', 'comments')
+        fields = ('id', 'created_at', 'updated_at', 'edited', 'edit_count',
+                  'body', 'author', 'edit_history', 'reply_count', 'comments',
+                  'more_comments')
+
+    def get_more_comments(self, obj):
+        """Return the link to the replies left out of `comments`, if any."""
+        return getattr(obj, 'more_comments', None)
 
 
 class FavoriteSerializer(serializers.ModelSerializer):
@@ -138,6 +173,8 @@ class FavoriteSerializer(serializers.ModelSerializer):
         model = Favorite
         fields = ('id', 'user_id', 'article_id')
         read_only_fields = ['id']
+        # Duplicates are caught by the unique constraint on save.
+        validators = []
 
 
 class RatingSerializer(serializers.ModelSerializer):
@@ -150,6 +187,8 @@ class RatingSerializer(serializers.ModelSerializer):
     class Meta:
         model = Rating
         fields = ['user', 'article', 'value', 'review']
+        # Duplicates are caught by the unique constraint on save.
+        validators = []
 
     def get_article(self, slug):
         article = Article.objects.get(slug=slug, published=True, activated=True)
@@ -175,6 +214,8 @@ class BookmarkSerializer(serializers.ModelSerializer):
         model = Bookmark
         fields = ('id', 'user_id', 'article_id')
         read_only_fields = ['id']
+        # Duplicates are caught by the unique constraint on save.
+        validators = []
 
 
 class PersonalArticlesSerializer(serializers.ModelSerializer):
@@ -1,15 +1,87 @@
-from django.db.models.signals import post_save
+from django.db import connections, transaction
+from django.db.models.signals import (m2m_changed, post_delete, post_migrate,
+                                      post_save)
 from django.dispatch import receiver
 
-from .models import Snapshot, ThreadedComment
+from authors.apps.profiles.models import Profile
+
+from .apps import ArticlesConfig
+from .cache import invalidate_articles
+from .models import Article, Like, Rating, Snapshot, Tag, ThreadedComment
+from .search import install_search_indexes
 
 
 @receiver(post_save, sender=ThreadedComment)
 def take_comment_snapshot_handler(sender, instance, created, **kwargs):
-    """Make a snapshot of a comment body everytime the comment is edited
-    except for when it has just been newly created.
+    """Make a snapshot of a comment body everytime an edit changes it,
+    but not when the comment has just been newly created.
     """
-    if created:
+    if created or instance.body == instance.previous_body:
         return
-    snapshot = Snapshot.objects.create(comment=instance, body=instance.body)
-    snapshot.save()
+    with transaction.atomic():
+        Snapshot.objects.record(instance, instance.previous_body)
+        instance.update_counters(edits=1)
+
+
+@receiver(post_migrate)
+def install_search_indexes_handler(sender, using, **kwargs):
+    """Create the full-text and trigram search indexes once the articles
+    tables exist. They are PostgreSQL only, so they aren't declared on the
+    models."""
+    if sender.name != ArticlesConfig.name:
+        return
+    install_search_indexes(connections[using])
+
+
+def invalidate_article_ids(article_ids):
+    invalidate_articles(Article.objects.filter(
+        pk__in=article_ids).values_list('slug', flat=True))
+
+
+@receiver(post_save, sender=Article)
+@receiver(post_delete, sender=Article)
+def invalidate_article_handler(sender, instance, **kwargs):
+    """Drop the cached payload of a saved or deleted article."""
+    invalidate_articles([instance.slug])
+
+
+@receiver(m2m_changed, sender=Article.tags.through)
+def invalidate_tagged_articles_handler(sender, instance, action, reverse,
+                                       pk_set, **kwargs):
+    """Drop the cached payloads of articles whose tags changed."""
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if not reverse:
+        invalidate_articles([instance.slug])
+    elif action == 'pre_clear':
+        invalidate_article_ids(instance.articles.values_list('pk', flat=True))
+    else:
+        invalidate_article_ids(pk_set)
+
+
+@receiver(post_save, sender=Tag)
+def invalidate_tag_articles_handler(sender, instance, created, **kwargs):
+    """Drop the cached payloads of the articles of a renamed tag."""
+    if not created:
+        invalidate_articles(instance.articles.values_list('slug', flat=True))
+
+
+@receiver(post_save, sender=Rating)
+@receiver(post_delete, sender=Rating)
+def invalidate_rated_article_handler(sender, instance, **kwargs):
+    """Drop the cached payload of an article whose ratings changed."""
+    invalidate_article_ids([instance.article_id])
+
+
+@receiver(post_save, sender=Like)
+@receiver(post_delete, sender=Like)
+def invalidate_liked_article_handler(sender, instance, **kwargs):
+    """Drop the cached payload of an article whose likes changed."""
+    invalidate_article_ids([instance.article_id_id])
+
+
+@receiver(post_save, sender=Profile)
+def invalidate_author_articles_handler(sender, instance, created, **kwargs):
+    """Drop the cached payloads of the articles of an updated author."""
+    if not created:
+        invalidate_articles(instance.articles.values_list('slug', flat=True))
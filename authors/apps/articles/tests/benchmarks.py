@@ -0,0 +1,253 @@
+"""
+Benchmarks for the articles app.
+
+They are not collected by the default test run. Run them explicitly with:
+
+    python manage.py test authors.apps.articles.tests.benchmarks \
+        --settings=authors.settings.test
+"""
+import os
+import time
+
+from django.contrib.auth import get_user_model
+from django.db import connection, reset_queries
+from django.test import TestCase
+from django.test.client import RequestFactory
+from django.urls import reverse
+from django.test.utils import CaptureQueriesContext
+from django.utils.text import slugify
+from rest_framework.test import APIClient
+
+from authors.apps.core.factories import UserFactory
+from authors.apps.core.tests.utils import timed
+
+from ..factories import ArticleFactory
+from ..models import (Article, Bookmark, Favorite, Like, Rating, Snapshot,
+                      ThreadedComment)
+from ..serializers import (TheArticleSerializer,
+                           ThreadedCommentOutputSerializer)
+from ..utils import generate_unique_slug
+
+
+class ReadingTimeBenchmark(TestCase):
+    """Feed serialization with computed versus stored reading time."""
+    page_size = 10
+
+    def setUp(self):
+        self.user = UserFactory.create()
+        self.request = RequestFactory().get('/api/articles/')
+
+    def _serialize_feed(self):
+        articles = Article.objects.published().for_feed()[:self.page_size]
+        return TheArticleSerializer(
+            articles, many=True,
+            context={'current_user': self.user, 'request': self.request,
+                     'following_ids': set()}).data
+
+    def test_feed_serialization(self):
+        print()
+        for kilobytes in (10, 25, 50, 100):
+            Article.objects.all().delete()
+            body = ('lorem ipsum ' * 100)[:1024] * kilobytes
+            for _ in range(self.page_size):
+                ArticleFactory.create(author=self.user.profile, body=body,
+                                      published=True)
+            stored = timed(self._serialize_feed, repeat=5)
+            # Rows that have not been backfilled take the old path and
+            # parse the body on every serialization.
+            Article.objects.update(reading_minutes=None)
+            computed = timed(self._serialize_feed, repeat=5)
+            print(f'{kilobytes:>4} KB bodies: computed {computed * 1000:8.2f}'
+                  f' ms, stored {stored * 1000:8.2f} ms per page of '
+                  f'{self.page_size}')
+
+
+def legacy_generate_unique_slug(model_instance, slugable_field_name,
+                                slug_field_name):
+    """The probing slug allocator, kept for comparison."""
+    slug = slugify(getattr(model_instance, slugable_field_name))
+    unique_slug = slug
+    extension = 1
+    ModelClass = model_instance.__class__
+
+    while ModelClass._default_manager.filter(
+        **{slug_field_name: unique_slug}
+    ).exists():
+        unique_slug = '{}-{}'.format(slug, extension)
+        extension += 1
+
+    return unique_slug
+
+
+class SlugBenchmark(TestCase):
+    """Allocating slugs for many articles with the same title."""
+    articles = 500
+
+    def setUp(self):
+        self.user = UserFactory.create()
+
+    def test_same_title_slug_allocation(self):
+        start = time.perf_counter()
+        for _ in range(self.articles):
+            Article.objects.create(title="Introduction", body="body",
+                                   author=self.user.profile)
+        create_time = time.perf_counter() - start
+
+        article = Article(title="Introduction", author=self.user.profile)
+        print()
+        print(f'created {self.articles} "Introduction" articles in '
+              f'{create_time:.2f} s')
+        for name, allocate in (('probing', legacy_generate_unique_slug),
+                               ('single query', generate_unique_slug)):
+            with CaptureQueriesContext(connection) as context:
+                elapsed = timed(
+                    lambda: allocate(article, "title", "slug"), repeat=3)
+            print(f'{name:>12}: next slug in {elapsed * 1000:8.2f} ms, '
+                  f'{len(context.captured_queries) // 3} queries')
+
+
+class CommentTreeBenchmark(TestCase):
+    """Serializing the comment list of an article with a large thread."""
+    top_level_comments = 400
+    replies_per_comment = 4
+    snapshots_per_comment = 5
+
+    def setUp(self):
+        self.user = UserFactory.create()
+        self.article = ArticleFactory.create(author=self.user.profile)
+        authors = [UserFactory.create().profile for _ in range(20)]
+        # Created one by one so their primary keys are set on every
+        # database, which bulk_create only does on PostgreSQL.
+        top_level = [
+            ThreadedComment.objects.create(
+                author=authors[index % len(authors)], article=self.article,
+                body="a comment")
+            for index in range(self.top_level_comments)]
+        ThreadedComment.objects.bulk_create(
+            ThreadedComment(author=authors[index % len(authors)],
+                            article=self.article, comment=comment,
+                            body="a reply")
+            for comment in top_level
+            for index in range(self.replies_per_comment))
+        Snapshot.objects.bulk_create(
+            Snapshot(comment_id=comment_id, body="an earlier body")
+            for comment_id in ThreadedComment.objects.filter(
+                article=self.article).values_list('pk', flat=True)
+            for _ in range(self.snapshots_per_comment))
+
+    def _serialize(self, comments):
+        return ThreadedCommentOutputSerializer(
+            comments, many=True, context={'current_user': self.user}).data
+
+    def _legacy_comments(self):
+        # Replies, authors and snapshots are each fetched per comment.
+        return ThreadedComment.active_objects.for_article(
+            self.article).filter(comment__isnull=True)
+
+    def _attached_comments(self):
+        # The loading the comment list view does, over every comment.
+        comments = list(ThreadedComment.active_objects.for_article(
+            self.article).filter(comment__isnull=True).for_output())
+        return ThreadedComment.active_objects.attach_replies(
+            comments, self.replies_per_comment)
+
+    def test_comment_list_serialization(self):
+        print()
+        print(f'{ThreadedComment.objects.count()} comments, '
+              f'{Snapshot.objects.count()} snapshots')
+        for name, load in (('per row', self._legacy_comments),
+                           ('attached', self._attached_comments)):
+            # The query log holds 9000 queries, which the per row pass
+            # fills, after which nothing more would be counted.
+            reset_queries()
+            with CaptureQueriesContext(connection) as context:
+                elapsed = timed(lambda: self._serialize(load()), repeat=3)
+            print(f'{name:>12}: {elapsed * 1000:9.2f} ms, '
+                  f'{len(context.captured_queries) // 3} queries')
+
+
+class RelationEndpointsBenchmark(TestCase):
+    """Favorite, bookmark, like and rating endpoints over large relation
+    tables.
+
+    The number of rows in each table is read from RELATION_BENCHMARK_ROWS.
+    The default keeps the run short. Set it to 10000000 on PostgreSQL to
+    reproduce production sizes.
+    """
+    rows = int(os.environ.get('RELATION_BENCHMARK_ROWS', 100000))
+    articles = 1000
+    batch_size = 10000
+
+    def setUp(self):
+        author = UserFactory.create()
+        Article.objects.bulk_create(
+            Article(title=f'Article {index}', slug=f'article-{index}',
+                    body='body', author=author.profile, published=True)
+            for index in range(self.articles))
+        article_ids = list(Article.objects.values_list('pk', flat=True))
+
+        users = -(-self.rows // self.articles)
+        get_user_model().objects.bulk_create(
+            get_user_model()(username=f'reader{index}',
+                             email=f'reader{index}@example.com')
+            for index in range(users))
+        user_ids = list(get_user_model().objects.filter(
+            username__startswith='reader').values_list('pk', flat=True))
+
+        pairs = ((user_id, article_id) for user_id in user_ids
+                 for article_id in article_ids)
+        batch = []
+        for count, (user_id, article_id) in enumerate(pairs):
+            if count == self.rows:
+                break
+            batch.append((user_id, article_id))
+            if len(batch) == self.batch_size:
+                self._create_relations(batch)
+                batch = []
+        self._create_relations(batch)
+
+        self.client = APIClient()
+        self.client.force_authenticate(user=UserFactory.create())
+        self.slug = 'article-0'
+
+    def _create_relations(self, pairs):
+        for model in (Favorite, Bookmark):
+            model.objects.bulk_create(
+                model(user_id_id=user_id, article_id_id=article_id)
+                for user_id, article_id in pairs)
+        Like.objects.bulk_create(
+            Like(user_id_id=user_id, article_id_id=article_id, is_like=True)
+            for user_id, article_id in pairs)
+        Rating.objects.bulk_create(
+            Rating(user_id=user_id, article_id=article_id, value=4)
+            for user_id, article_id in pairs)
+
+    def _measure(self, name, method, url, data=None):
+        with CaptureQueriesContext(connection) as context:
+            start = time.perf_counter()
+            response = getattr(self.client, method)(url, data, format='json')
+            elapsed = time.perf_counter() - start
+        print(f'{name:>18}: {response.status_code} in '
+              f'{elapsed * 1000:8.2f} ms, '
+              f'{len(context.captured_queries)} queries')
+
+    def test_relation_endpoints(self):
+        favorite = reverse('articles:favorite', args=[self.slug])
+        bookmark = reverse('articles:create_bookmark', args=[self.slug])
+        toggle = reverse('articles:toggle_like', args=[self.slug])
+        rate = reverse('articles:rate', args=[self.slug])
+        print()
+        print(f'{self.rows} rows in each relation table')
+        self._measure('favorite', 'post', favorite)
+        self._measure('favorite again', 'post', favorite)
+        self._measure('get favorite', 'get', favorite)
+        self._measure('unfavorite', 'delete', favorite)
+        self._measure('bookmark', 'post', bookmark)
+        self._measure('bookmark again', 'post', bookmark)
+        self._measure('unbookmark', 'delete', bookmark)
+        self._measure('toggle like', 'post', toggle, {'is_like': True})
+        self._measure('toggle dislike', 'post', toggle, {'is_like': False})
+        self._measure('undo dislike', 'post', toggle, {'is_like': False})
+        rating = {'rating': {'value': 4, 'review': 'good'}}
+        self._measure('rate', 'post', rate, rating)
+        self._measure('rate again', 'post', rate, rating)
@@ -0,0 +1,109 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils.http import http_date
+
+from rest_framework.test import APIClient
+
+from authors.apps.core.factories import UserFactory
+
+from ..factories import ArticleFactory
+from ..models import Like, Rating, Tag
+
+
+class ArticleCacheTestCase(TestCase):
+    """Tests for the cached single article payload."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.author = UserFactory.create()
+        self.reader = UserFactory.create()
+        self.article = ArticleFactory.create(
+            author=self.author.profile, body="a body", published=True)
+        self.url = reverse('articles:get_an_article', args=[self.article.slug])
+
+    def _get(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries), response.json()['Article']
+
+    def test_anonymous_reads_are_served_from_the_cache(self):
+        self._get()
+        queries, data = self._get()
+        # Only the conditional GET state query, nothing is serialized.
+        self.assertEqual(queries, 1)
+        self.assertEqual(data['slug'], self.article.slug)
+        self.assertFalse(data['author']['following'])
+
+    def test_following_is_worked_out_per_viewer(self):
+        self._get()
+        self.reader.profile.followings.add(self.author.profile)
+        self.client.force_authenticate(user=self.reader)
+        _, data = self._get()
+        self.assertTrue(data['author']['following'])
+        self.client.force_authenticate(user=self.author)
+        _, data = self._get()
+        self.assertFalse(data['author']['following'])
+
+    def test_changes_invalidate_the_cached_payload(self):
+        self._get()
+        self.article.title = "A new title"
+        self.article.save()
+        _, data = self._get()
+        self.assertEqual(data['title'], "A new title")
+
+        self.article.tags.add(Tag.objects.create(tag="cached"))
+        _, data = self._get()
+        self.assertEqual(data['tagList'], ["cached"])
+
+        Rating.objects.create(user=self.reader, article=self.article, value=4)
+        self.article.update_rating_aggregate(4, count_delta=1)
+        Like.objects.create(user_id=self.reader, article_id=self.article,
+                            is_like=True)
+        self.article.update_like_counts(likes=1)
+        _, data = self._get()
+        self.assertEqual(data['average_rating'], 4.0)
+        self.assertEqual(data['like_count'], 1)
+
+        profile = self.author.profile
+        profile.bio = "A new bio"
+        profile.save()
+        _, data = self._get()
+        self.assertEqual(data['author']['bio'], "A new bio")
+
+    def test_unpublished_articles_are_not_found(self):
+        self.article.published = False
+        self.article.save()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 404)
+
+    def test_unchanged_article_is_not_modified(self):
+        response = self.client.get(self.url)
+        etag = response['ETag']
+        # Counters change without moving `updated_at`.
+        self.assertNotIn('Last-Modified', response)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+        self.article.update_like_counts(likes=1)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_if_modified_since_is_not_answered_from_timestamps(self):
+        self.client.get(self.url)
+        self.article.update_like_counts(likes=1)
+        response = self.client.get(
+            self.url, HTTP_IF_MODIFIED_SINCE=http_date())
+        self.assertEqual(response.status_code, 200)
+
+    def test_etag_follows_the_viewer(self):
+        self.client.force_authenticate(user=self.reader)
+        etag = self.client.get(self.url)['ETag']
+        self.reader.profile.followings.add(self.author.profile)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json()['Article']['author']['following'])
@@ -1,3 +1,6 @@
+from io import StringIO
+
+from django.core.management import call_command
 from rest_framework import status
 
 from .article_tests_base_class import ArticlesBaseTest
@@ -97,3 +100,48 @@ class ArticleRatingTestCase(ArticlesBaseTest):
         self.rating = Rating.objects.create(article=retrieved_article, user= self.user2,
                                             value=1, review="no way")
         self.assertEqual(str(self.rating), "This is rating no: 1")
+
+    def test_rating_aggregates_follow_ratings(self):
+        """Tests that posting and updating a rating maintain the article's
+        denormalized rating columns."""
+        self.client.post(self.rate_url,
+                         valid_rate_data1, **self.header_user2, format='json')
+        article = Article.objects.get(slug=self.slug)
+        self.assertEqual((article.rating_count, article.rating_sum), (1, 2))
+        self.client.put(self.rate_url, update_rating_data,
+                        **self.header_user2, format='json')
+        article.refresh_from_db()
+        self.assertEqual((article.rating_count, article.rating_sum), (1, 3))
+        self.assertEqual(article.get_average_rating(), 3.0)
+
+    def test_average_rating_is_per_article(self):
+        """Tests that ratings of other articles don't leak into the average."""
+        article = Article.objects.get(slug=self.slug)
+        other = Article.objects.create(title="Other", body="body",
+                                       author=self.user2.profile)
+        Rating.objects.create(article=other, user=self.user1, value=5)
+        other.update_rating_aggregate(5, count_delta=1)
+        article.refresh_from_db()
+        self.assertEqual(article.get_average_rating(), no_ratings_data_response)
+
+    def test_save_does_not_overwrite_rating_aggregates(self):
+        article = Article.objects.get(slug=self.slug)
+        article.update_rating_aggregate(4, count_delta=1)
+        article.title = "A stale copy"
+        article.save()
+        article.refresh_from_db()
+        self.assertEqual((article.rating_count, article.rating_sum), (1, 4))
+
+    def test_rebuild_rating_aggregates_command(self):
+        article = Article.objects.get(slug=self.slug)
+        Rating.objects.create(article=article, user=self.user2, value=2)
+        Rating.objects.create(article=article, user=self.user1, value=5)
+        Article.objects.create(title="Unrated", body="body",
+                               author=self.user2.profile)
+        call_command('rebuild_rating_aggregates', batch_size=1,
+                     stdout=StringIO())
+        article.refresh_from_db()
+        self.assertEqual((article.rating_count, article.rating_sum), (2, 7))
+        self.assertEqual(article.get_average_rating(), 3.5)
+        unrated = Article.objects.get(title="Unrated")
+        self.assertEqual((unrated.rating_count, unrated.rating_sum), (0, 0))
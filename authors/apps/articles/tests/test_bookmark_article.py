@@ -23,6 +23,16 @@ class BookmarkArticleTestCase(ArticlesBaseTest):
                                     like_data, **self.header_user1, format='json')
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
 
+    def test_duplicate_form_encoded_bookmark(self):
+        """Form-encoded bodies are immutable, bookmarking twice still
+        answers 400"""
+        response = self.client.post(self.bookmark_article_url, like_data,
+                                    **self.header_user1, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        response = self.client.post(self.bookmark_article_url, like_data,
+                                    **self.header_user1, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
     def test_get_bookmark(self):
         """Test get bookmark"""
         response = self.client.get(self.bookmark_article_url,
@@ -1,7 +1,10 @@
 import json
 
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils.http import http_date
 from django.contrib.auth import get_user_model
 
 from rest_framework import status
@@ -52,7 +55,7 @@ class CommentListCreateViewTest(TestCase):
         """Test an author can coment on a comment."""
         comment = ThreadedComment.objects.create(
             author=self.user1.profile, article=self.article)
-        view = CommentListCreateView.as_view()
+        view = CommentRetrieveEditDeleteView.as_view()
         new_comment = {
             "body": "This is a comment's comment"
         }
@@ -63,6 +66,8 @@ class CommentListCreateViewTest(TestCase):
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         self.assertEqual(response.data['body'],
                          "This is a comment's comment")
+        comment.refresh_from_db()
+        self.assertEqual(comment.reply_count, 1)
 
     def test_author_only_coment_on_article_comments(self):
         """Test an author cannot coment on a comment of a comment."""
@@ -136,7 +141,8 @@ class CommentListCreateViewTest(TestCase):
             reverse("articles:list_create_comments", args=[article_slug]),
             format='json')
         response = view(request, article_slug=article_slug)
-        self.assertEqual(response.data, [])
+        self.assertEqual(response.data['results'], [])
+        self.assertIsNone(response.data['next'])
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
     def test_retrieving_a_comment(self):
@@ -213,3 +219,200 @@ class CommentListCreateViewTest(TestCase):
         force_authenticate(request2, user=self.user1)
         response2 = view(request2, article_slug=self.article.slug, pk=comment.pk)
         self.assertEqual(response2.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class CommentListQueriesTest(TestCase):
+    """The comment list should cost the same number of queries however
+    many comments, replies and snapshots an article has."""
+
+    def setUp(self):
+        self.user1 = UserFactory.create()
+        self.article = ArticleFactory.create(author=self.user1.profile)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user1)
+
+    def _add_comments(self, count):
+        for _ in range(count):
+            author = UserFactory.create().profile
+            comment = ThreadedComment.objects.create(
+                author=author, article=self.article, body="a comment")
+            reply = ThreadedComment.objects.create(
+                author=author, article=self.article, comment=comment,
+                body="a reply")
+            for edit in range(2):
+                reply.body = f"edit {edit}"
+                reply.save()
+
+    def _list_queries(self, query=None):
+        url = reverse("articles:list_create_comments",
+                      args=[self.article.slug])
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, query)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(context.captured_queries), response.json()
+
+    def test_comment_list_query_count_is_constant(self):
+        query = {'include': 'edit_history', 'limit': 20}
+        self._add_comments(1)
+        one_comment_queries, _ = self._list_queries(query)
+        self._add_comments(9)
+        ten_comment_queries, data = self._list_queries(query)
+        self.assertEqual(one_comment_queries, ten_comment_queries)
+        comments = data['Comments']['results']
+        self.assertEqual(len(comments), 10)
+        reply = comments[0]['comments'][0]
+        self.assertTrue(reply['edited'])
+        self.assertEqual(len(reply['edit_history']), 2)
+
+    def test_comment_list_skips_snapshots_by_default(self):
+        self._add_comments(2)
+        _, data = self._list_queries()
+        reply = data['Comments']['results'][0]['comments'][0]
+        self.assertTrue(reply['edited'])
+        self.assertNotIn('edit_history', reply)
+        _, data = self._list_queries({'include': 'edit_history'})
+        reply = data['Comments']['results'][0]['comments'][0]
+        self.assertEqual(len(reply['edit_history']), 2)
+
+
+class CommentPaginationTest(TestCase):
+    """Top-level comments are cursor paginated and replies are capped."""
+
+    def setUp(self):
+        self.user1 = UserFactory.create()
+        self.article = ArticleFactory.create(author=self.user1.profile)
+        self.client = APIClient()
+
+    def test_paging_through_top_level_comments(self):
+        for _ in range(5):
+            ThreadedComment.objects.create(
+                author=self.user1.profile, article=self.article, body="hi")
+        url = reverse("articles:list_create_comments",
+                      args=[self.article.slug]) + '?limit=2'
+        seen = []
+        while url:
+            data = self.client.get(url).json()['Comments']
+            seen.extend(comment['id'] for comment in data['results'])
+            url = data['next']
+        expected = list(ThreadedComment.objects.order_by(
+            '-created_at', '-id').values_list('id', flat=True))
+        self.assertEqual(seen, expected)
+
+    def test_loading_more_replies(self):
+        comment = ThreadedComment.objects.create(
+            author=self.user1.profile, article=self.article, body="hi")
+        for _ in range(CommentListCreateView.inline_replies + 2):
+            ThreadedComment.objects.create(
+                author=self.user1.profile, article=self.article,
+                comment=comment, body="reply")
+        response = self.client.get(reverse("articles:list_create_comments",
+                                           args=[self.article.slug]))
+        listed = response.json()['Comments']['results'][0]
+        self.assertEqual(len(listed['comments']),
+                         CommentListCreateView.inline_replies)
+
+        url = listed['more_comments']
+        seen = [reply['id'] for reply in listed['comments']]
+        while url:
+            data = self.client.get(url).json()['Comments']
+            seen.extend(reply['id'] for reply in data['results'])
+            url = data['next']
+        expected = list(ThreadedComment.objects.filter(
+            comment=comment).order_by('-created_at', '-id').values_list(
+                'id', flat=True))
+        self.assertEqual(seen, expected)
+
+    def test_no_more_replies_link_when_all_are_shown(self):
+        comment = ThreadedComment.objects.create(
+            author=self.user1.profile, article=self.article, body="hi")
+        ThreadedComment.objects.create(
+            author=self.user1.profile, article=self.article,
+            comment=comment, body="reply")
+        response = self.client.get(reverse("articles:list_create_comments",
+                                           args=[self.article.slug]))
+        listed = response.json()['Comments']['results'][0]
+        self.assertEqual(len(listed['comments']), 1)
+        self.assertIsNone(listed['more_comments'])
+
+    def test_replies_of_a_missing_comment(self):
+        response = self.client.get(reverse(
+            "articles:comment_replies", args=[self.article.slug, 0]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class ConditionalCommentGetTest(TestCase):
+    """Unchanged comments are answered with `304 Not Modified`."""
+
+    def setUp(self):
+        self.user1 = UserFactory.create()
+        self.article = ArticleFactory.create(author=self.user1.profile)
+        self.comment = ThreadedComment.objects.create(
+            author=self.user1.profile, article=self.article, body="hi")
+        self.client = APIClient()
+
+    def _assert_not_modified_until(self, url, change):
+        etag = self.client.get(url)['ETag']
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(len(context.captured_queries), 1)
+        change()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_comment_list(self):
+        url = reverse("articles:list_create_comments",
+                      args=[self.article.slug])
+
+        def add_reply():
+            ThreadedComment.objects.create(
+                author=self.user1.profile, article=self.article,
+                comment=self.comment, body="reply")
+        self._assert_not_modified_until(url, add_reply)
+
+    def test_comment_list_ignores_if_modified_since(self):
+        url = reverse("articles:list_create_comments",
+                      args=[self.article.slug])
+        ThreadedComment.objects.create(
+            author=self.user1.profile, article=self.article, body="more")
+        self.assertNotIn('Last-Modified', self.client.get(url))
+        # Deleting a comment doesn't move the newest `updated_at`.
+        self.comment.soft_delete()
+        response = self.client.get(
+            url, HTTP_IF_MODIFIED_SINCE=http_date())
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_comment_list_follows_commenter_profiles(self):
+        url = reverse("articles:list_create_comments",
+                      args=[self.article.slug])
+
+        def edit_profile():
+            profile = self.user1.profile
+            profile.bio = "A new bio"
+            profile.save()
+        self._assert_not_modified_until(url, edit_profile)
+
+    def test_comment_list_follows_the_viewer_following_commenters(self):
+        reader = UserFactory.create()
+        self.client.force_authenticate(user=reader)
+        url = reverse("articles:list_create_comments",
+                      args=[self.article.slug])
+
+        def follow():
+            reader.profile.followings.add(self.user1.profile)
+        self._assert_not_modified_until(url, follow)
+
+    def test_single_comment(self):
+        url = reverse("articles:comment",
+                      args=[self.article.slug, self.comment.pk])
+
+        def edit():
+            self.comment.body = "edited"
+            self.comment.save()
+        self._assert_not_modified_until(url, edit)
+
+    def test_missing_comment_has_no_etag(self):
+        response = self.client.get(reverse(
+            "articles:comment", args=[self.article.slug, 'missing']))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertNotIn('ETag', response)
@@ -23,6 +23,16 @@ class FavoriteArticleTestCase(ArticlesBaseTest):
                                     like_data, **self.header_user1, format='json')
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
 
+    def test_duplicate_form_encoded_favorite(self):
+        """Form-encoded bodies are immutable, favoriting twice still
+        answers 400"""
+        response = self.client.post(self.favorite_article_url, like_data,
+                                    **self.header_user1, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        response = self.client.post(self.favorite_article_url, like_data,
+                                    **self.header_user1, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
     def test_get_favorite(self):
         """Test get favorite"""
         response = self.client.get(self.favorite_article_url,
@@ -0,0 +1,263 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework.test import APIClient
+
+from authors.apps.core.factories import UserFactory
+
+from ..factories import ArticleFactory
+from .. import search
+from ..models import Article, Bookmark, Favorite, Rating, Tag
+
+
+class ArticleFeedQueryTestCase(TestCase):
+    """Query budget tests for the article feed."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user1 = UserFactory.create()
+        self.article1 = ArticleFactory.create(
+            author=self.user1.profile, body="a body", published=True)
+
+    def _feed_queries(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse('articles:get_article'))
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries), response
+
+    def _add_tags(self, start, stop):
+        for index in range(start, stop):
+            self.article1.tags.add(Tag.objects.create(tag=f"tag{index}"))
+
+    def test_feed_query_count_does_not_depend_on_tag_count(self):
+        self._add_tags(0, 1)
+        one_tag_queries, _ = self._feed_queries()
+        self._add_tags(1, 50)
+        fifty_tag_queries, response = self._feed_queries()
+        self.assertEqual(one_tag_queries, fifty_tag_queries)
+        tag_list = response.json()['Articles']['results'][0]['tagList']
+        self.assertEqual(len(tag_list), 50)
+        self.assertIn("tag49", tag_list)
+
+
+class ArticleFeedQueryBudgetTestCase(TestCase):
+    """The feed should cost the same number of queries for any page size."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.reader = UserFactory.create()
+        self.client.force_authenticate(user=self.reader)
+
+    def _create_articles(self, count):
+        for _ in range(count):
+            author = UserFactory.create()
+            article = ArticleFactory.create(
+                author=author.profile, body="a body", published=True)
+            article.tags.add(Tag.objects.get_or_create(tag="feed")[0])
+            Rating.objects.create(user=self.reader, article=article, value=4)
+            article.update_rating_aggregate(4, count_delta=1)
+            self.reader.profile.followings.add(author.profile)
+
+    def _feed_queries(self, limit):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse('articles:get_article'),
+                                       {'limit': limit})
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries), response
+
+    def test_feed_query_count_does_not_depend_on_page_size(self):
+        self._create_articles(1)
+        one_article_queries, _ = self._feed_queries(1)
+        self._create_articles(9)
+        ten_article_queries, response = self._feed_queries(10)
+        self.assertEqual(one_article_queries, ten_article_queries)
+        results = response.json()['Articles']['results']
+        self.assertEqual(len(results), 10)
+        self.assertTrue(all(item['author']['following'] for item in results))
+        self.assertTrue(all(item['average_rating'] == 4.0
+                            for item in results))
+
+
+class ArticleFeedPaginationTestCase(TestCase):
+    """Tests for limit/offset and keyset pagination of the feed."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user1 = UserFactory.create()
+        for _ in range(5):
+            ArticleFactory.create(
+                author=self.user1.profile, body="a body", published=True)
+        # Give every article the same timestamp so ties must be broken on id
+        Article.objects.update(created_at=timezone.now())
+
+    def test_limit_offset_feed_runs_a_single_count(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse('articles:get_article'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['Articles']['count'], 5)
+        counts = [query for query in context.captured_queries
+                  if 'COUNT(' in query['sql']]
+        self.assertEqual(len(counts), 1)
+
+    def test_cursor_feed_pages_through_all_articles(self):
+        url = reverse('articles:get_article') + '?pagination=cursor&limit=2'
+        seen = []
+        while url:
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertFalse(any('COUNT(' in query['sql']
+                                 for query in context.captured_queries))
+            data = response.json()['Articles']
+            seen.extend(item['id'] for item in data['results'])
+            url = data['next']
+        expected = list(Article.objects.order_by(
+            '-created_at', '-id').values_list('id', flat=True))
+        self.assertEqual(seen, expected)
+
+    def test_cursor_feed_previous_link(self):
+        url = reverse('articles:get_article') + '?pagination=cursor&limit=2'
+        first = self.client.get(url).json()['Articles']
+        second = self.client.get(first['next']).json()['Articles']
+        back = self.client.get(second['previous']).json()['Articles']
+        self.assertEqual([item['id'] for item in back['results']],
+                         [item['id'] for item in first['results']])
+
+    def test_cursor_feed_with_no_articles(self):
+        Article.objects.all().delete()
+        response = self.client.get(reverse('articles:get_article'),
+                                   {'pagination': 'cursor'})
+        self.assertEqual(response.status_code, 404)
+
+    def test_cursor_feed_with_invalid_cursor(self):
+        response = self.client.get(reverse('articles:get_article'),
+                                   {'pagination': 'cursor', 'cursor': 'bad'})
+        self.assertEqual(response.status_code, 404)
+
+
+class ArticleSearchTestCase(TestCase):
+    """Tests for searching articles."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user1 = UserFactory.create()
+        self.article1 = ArticleFactory.create(
+            author=self.user1.profile, title="Testing django",
+            body="a body", published=True)
+        self.article2 = ArticleFactory.create(
+            author=self.user1.profile, title="Another title",
+            body="a body", published=True)
+
+    def _search(self, field, query, **params):
+        params['query'] = query
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(
+                reverse('articles:search-article', args=[field]), params)
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries), response.json()
+
+    def _add_tags(self, article, start, stop):
+        for index in range(start, stop):
+            article.tags.add(
+                Tag.objects.get_or_create(tag=f"python{index}")[0])
+
+    def test_search_by_title(self):
+        _, data = self._search('title', 'django')
+        self.assertEqual(data['count'], 1)
+        self.assertEqual(data['results'][0]['id'], self.article1.id)
+
+    def test_search_by_unknown_field_finds_nothing(self):
+        _, data = self._search('slug', 'django')
+        self.assertEqual(data['count'], 0)
+
+    def test_tag_search_query_count_does_not_depend_on_matching_tags(self):
+        self._add_tags(self.article1, 0, 1)
+        one_tag_queries, _ = self._search('tags', 'python')
+        self._add_tags(self.article1, 1, 20)
+        self._add_tags(self.article2, 0, 20)
+        many_tag_queries, data = self._search('tags', 'python')
+        self.assertEqual(one_tag_queries, many_tag_queries)
+        # Each article is listed once however many of its tags match
+        self.assertEqual(data['count'], 2)
+        self.assertEqual(sorted(item['id'] for item in data['results']),
+                         sorted([self.article1.id, self.article2.id]))
+
+    def test_tag_search_is_paginated_in_the_database(self):
+        self._add_tags(self.article1, 0, 2)
+        self._add_tags(self.article2, 0, 2)
+        _, data = self._search('tags', 'python', limit=1)
+        self.assertEqual(data['count'], 2)
+        self.assertEqual(len(data['results']), 1)
+        self.assertIsNotNone(data['next'])
+
+
+class ArticleSearchHelpersTestCase(TestCase):
+    """Tests for the full-text search helpers."""
+
+    def test_tsquery_text_matches_weighted_prefixes(self):
+        self.assertEqual(search.to_tsquery_text("Django's ORM!", 'A'),
+                         "Django:*A & s:*A & ORM:*A")
+
+    def test_tsquery_text_without_words(self):
+        self.assertEqual(search.to_tsquery_text("&|!:*_"), "")
+        self.assertIsNone(search.field_query('title', "&|!"))
+
+    def test_prefix_search_query_uses_to_tsquery(self):
+        sql_query = Article.objects.all().query
+        query = search.field_query('title', 'django').resolve_expression(
+            sql_query)
+        sql, params = query.as_sql(sql_query.get_compiler('default'),
+                                   connection)
+        self.assertTrue(sql.startswith('to_tsquery('))
+        self.assertEqual(params, ['english', 'django:*A'])
+
+
+class SavedArticlesQueryTestCase(TestCase):
+    """Favorites and bookmarks are paginated and cost a fixed number of
+    queries per page."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.reader = UserFactory.create()
+        self.client.force_authenticate(user=self.reader)
+
+    def _save_articles(self, model, count):
+        for _ in range(count):
+            author = UserFactory.create()
+            article = ArticleFactory.create(
+                author=author.profile, body="a body", published=True)
+            article.tags.add(Tag.objects.get_or_create(tag="saved")[0])
+            model.objects.create(user_id=self.reader, article_id=article)
+
+    def _list_queries(self, url):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries), response.json()
+
+    def test_saved_article_query_count_is_constant(self):
+        for model, name in ((Favorite, 'favorites'),
+                            (Bookmark, 'bookmarks')):
+            url = reverse(f'articles:get_{name}') + '?limit=20'
+            self._save_articles(model, 1)
+            one_queries, _ = self._list_queries(url)
+            self._save_articles(model, 9)
+            ten_queries, data = self._list_queries(url)
+            self.assertEqual(one_queries, ten_queries)
+            self.assertEqual(len(data[name]), 10)
+            self.assertEqual(data[name][0]['tagList'], ['saved'])
+
+    def test_paging_through_favorites(self):
+        self._save_articles(Favorite, 5)
+        url = reverse('articles:get_favorites') + '?limit=2'
+        seen = []
+        while url:
+            _, data = self._list_queries(url)
+            seen.extend(article['id'] for article in data['favorites'])
+            url = data['next']
+        expected = list(Favorite.objects.order_by('-id').values_list(
+            'article_id', flat=True))
+        self.assertEqual(seen, expected)
@@ -1,4 +1,7 @@
 import os
+from io import StringIO
+
+from django.core.management import call_command
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase, APIClient
@@ -25,6 +28,16 @@ class LikeDislikeArticleTestCase(ArticlesBaseTest):
                                     like_data, **self.header_user1, format='json')
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
+    def test_duplicate_form_encoded_like(self):
+        """Form-encoded bodies are immutable, liking twice still answers
+        400"""
+        response = self.client.post(self.like_article_url, like_data,
+                                    **self.header_user1, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        response = self.client.post(self.like_article_url, like_data,
+                                    **self.header_user1, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
     def test_get_like(self):
         """Test like"""
         response = self.client.get(self.like_article_url,
@@ -119,3 +132,74 @@ class LikeDislikeArticleTestCase(ArticlesBaseTest):
         detail = "This article has not been found."
         self.assertEqual(response.data.get('detail'), detail)
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class LikeCountsTestCase(ArticlesBaseTest):
+    """Test the like counts kept on articles"""
+
+    def setUp(self):
+        super().setUp()
+        self.article = Article.objects.get(slug=self.slug)
+        self.toggle_url = self.like_article_url + 'toggle/'
+
+    def assert_counts(self, likes, dislikes):
+        self.article.refresh_from_db()
+        self.assertEqual((self.article.like_count,
+                          self.article.dislike_count), (likes, dislikes))
+
+    def test_counts_follow_create_update_and_delete(self):
+        response = self.client.post(self.like_article_url,
+                                    like_data, **self.header_user1, format='json')
+        like_id = response.data.get('id')
+        self.client.post(self.like_article_url, {"is_like": False},
+                         **self.header_user2, format='json')
+        self.assert_counts(1, 1)
+        self.client.patch(self.like_article_url + str(like_id) + '/',
+                          {"is_like": False}, **self.header_user1, format='json')
+        self.assert_counts(0, 2)
+        self.client.delete(self.like_article_url + str(like_id) + '/',
+                           **self.header_user1)
+        self.assert_counts(0, 1)
+        response = self.client.get(self.all_article_likes_url,
+                                   **self.header_user1)
+        self.assertEqual(response.data,
+                         {"total_likes": 0, "total_dislikes": 1})
+
+    def test_duplicate_like_does_not_change_counts(self):
+        self.client.post(self.like_article_url,
+                         like_data, **self.header_user1, format='json')
+        response = self.client.post(self.like_article_url,
+                                    like_data, **self.header_user1, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assert_counts(1, 0)
+
+    def test_toggle_like(self):
+        response = self.client.post(self.toggle_url, {"is_like": True},
+                                    **self.header_user1, format='json')
+        self.assertEqual(response.data,
+                         {"is_like": True, "likes": 1, "dislikes": 0})
+        response = self.client.post(self.toggle_url, {"is_like": False},
+                                    **self.header_user1, format='json')
+        self.assertEqual(response.data,
+                         {"is_like": False, "likes": 0, "dislikes": 1})
+        response = self.client.post(self.toggle_url, {"is_like": False},
+                                    **self.header_user1, format='json')
+        self.assertEqual(response.data,
+                         {"is_like": "undefined", "likes": 0, "dislikes": 0})
+        self.assertFalse(Like.objects.exists())
+
+    def test_toggle_like_validation(self):
+        response = self.client.post(self.toggle_url, {},
+                                    **self.header_user1, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.post('/api/articles/invalid-slug/like/toggle/',
+                                    like_data, **self.header_user1, format='json')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_rebuild_like_counts_command(self):
+        Like.objects.create(user_id=self.user1, article_id=self.article,
+                            is_like=True)
+        Like.objects.create(user_id=self.user2, article_id=self.article,
+                            is_like=False)
+        call_command('rebuild_like_counts', batch_size=1, stdout=StringIO())
+        self.assert_counts(1, 1)
@@ -84,3 +84,28 @@ class  CommentActiveObjectsManagerTests(TestCase):
             ThreadedComment.active_objects.for_comment(comment=comment1),
             [repr(comment) for comment in comments]
         )
+
+    def test_attaching_a_bounded_number_of_replies(self):
+        comment1 = ThreadedComment.objects.create(author=self.user1.profile,
+                                         article=self.article1)
+        comment2 = ThreadedComment.objects.create(author=self.user1.profile,
+                                         article=self.article1)
+        replies = [ThreadedComment.objects.create(author=self.user2.profile,
+                                         article=self.article1, comment=comment1)
+                   for _ in range(3)]
+        ThreadedComment.objects.create(author=self.user2.profile,
+                                       article=self.article1, comment=comment1,
+                                       is_active=False)
+        with self.assertNumQueries(2):
+            ThreadedComment.active_objects.attach_replies(
+                [comment1, comment2], 2, edit_history=False)
+            self.assertEqual(comment1.replies, replies[:0:-1])
+            self.assertTrue(comment1.has_more_replies)
+            self.assertEqual(comment2.replies, [])
+            self.assertFalse(comment2.has_more_replies)
+            self.assertFalse(comment1.replies[0].edited)
+
+    def test_attaching_replies_to_no_comments(self):
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                ThreadedComment.active_objects.attach_replies([], 2), [])
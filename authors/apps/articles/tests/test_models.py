@@ -1,9 +1,14 @@
-from django.test import TestCase
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import IntegrityError, transaction
+from django.test import TestCase, override_settings
 
 from authors.apps.core.factories import UserFactory
 
 from ..factories import ArticleFactory
-from ..models import Snapshot, ThreadedComment, Bookmark
+from ..models import (Bookmark, Favorite, Like, Rating, Snapshot,
+                      ThreadedComment)
 
 
 class CommentMethodTests(TestCase):
@@ -53,6 +58,148 @@ class CommentSnapshotSignalTests(TestCase):
         snapshots = Snapshot.objects.filter(comment=comment)
         self.assertQuerysetEqual(comment.snapshots.all(),
                                  [repr(snap) for snap in snapshots])
-        self.assertEqual(snapshots.first().body, comment.body)
+        self.assertEqual(comment.edit_history[0].body, comment.body)
         same_comment = ThreadedComment.objects.get(id = comment.id)
         self.assertTrue(same_comment.edited)
+
+    def test_no_snapshot_when_the_body_is_unchanged(self):
+        comment = ThreadedComment.objects.create(
+            author=self.user1.profile, article=self.article1, body="body")
+        comment.soft_delete()
+        comment.undo_soft_deletion()
+        ThreadedComment.objects.get(pk=comment.pk).save()
+        self.assertFalse(comment.snapshots.exists())
+
+    def test_edit_history_is_stored_as_deltas(self):
+        bodies = ["the first version of a comment",
+                  "the second version of a comment",
+                  "a second version\nof the comment, rewritten",
+                  ""]
+        comment = ThreadedComment.objects.create(
+            author=self.user1.profile, article=self.article1, body="original")
+        for body in bodies:
+            comment = ThreadedComment.objects.get(pk=comment.pk)
+            comment.body = body
+            comment.save()
+        self.assertFalse(Snapshot.objects.filter(body__isnull=False).exists())
+        self.assertEqual([snapshot.body for snapshot in comment.edit_history],
+                         bodies[::-1])
+
+    def test_edits_from_stale_copies_keep_the_history(self):
+        comment = ThreadedComment.objects.create(
+            author=self.user1.profile, article=self.article1,
+            body="the original comment")
+        first = ThreadedComment.objects.get(pk=comment.pk)
+        second = ThreadedComment.objects.get(pk=comment.pk)
+        first.body = "the comment edited once"
+        first.save()
+        # Still holds the original body, as a concurrent edit would.
+        second.body = "a comment edited twice over"
+        second.save()
+        comment.refresh_from_db()
+        self.assertEqual([snapshot.body for snapshot in comment.edit_history],
+                         ["a comment edited twice over",
+                          "the comment edited once"])
+        self.assertEqual(comment.edit_count, 2)
+
+    @override_settings(COMMENT_SNAPSHOT_RETENTION=2)
+    def test_old_snapshots_are_pruned(self):
+        comment = ThreadedComment.objects.create(
+            author=self.user1.profile, article=self.article1, body="original")
+        for edit in range(4):
+            comment.body = f"edit {edit}"
+            comment.save()
+        self.assertEqual([snapshot.body for snapshot in comment.edit_history],
+                         ["edit 3", "edit 2"])
+        comment.refresh_from_db()
+        self.assertEqual(comment.edit_count, 4)
+
+    @override_settings(COMMENT_SNAPSHOT_RETENTION=3)
+    def test_compact_comment_history_command(self):
+        comment = ThreadedComment.objects.create(
+            author=self.user1.profile, article=self.article1, body="v4")
+        # Full copies, oldest first, as saved before deltas were used.
+        for body in ("v0", "v1", "v1", "v2", "v3", "v3", "v4", "v4"):
+            Snapshot.objects.create(comment=comment, body=body)
+        comment.update_counters(edits=8)
+        call_command('compact_comment_history', batch_size=1,
+                     stdout=StringIO())
+        self.assertFalse(Snapshot.objects.filter(body__isnull=False).exists())
+        self.assertEqual([snapshot.body for snapshot in comment.edit_history],
+                         ["v4", "v3", "v2"])
+        comment.refresh_from_db()
+        self.assertEqual(comment.edit_count, 5)
+
+
+class CommentCounterTests(TestCase):
+
+    def setUp(self):
+        self.user1 = UserFactory.create()
+        self.article1 = ArticleFactory.create(author=self.user1.profile)
+        self.comment = ThreadedComment.objects.create(
+            author=self.user1.profile, article=self.article1, body="body")
+
+    def test_edits_are_counted(self):
+        for body in ("first edit", "second edit"):
+            self.comment.body = body
+            self.comment.save()
+        self.comment.refresh_from_db()
+        self.assertEqual(self.comment.edit_count, 2)
+        self.assertTrue(self.comment.edited)
+
+    def test_saving_a_stale_comment_keeps_the_counters(self):
+        stale = ThreadedComment.objects.get(pk=self.comment.pk)
+        self.comment.update_counters(replies=3)
+        stale.body = "edited"
+        stale.save()
+        stale.refresh_from_db()
+        self.assertEqual(stale.reply_count, 3)
+        self.assertEqual(stale.edit_count, 1)
+
+    def test_soft_deleting_a_reply_updates_the_reply_count(self):
+        reply = ThreadedComment.objects.create(
+            author=self.user1.profile, article=self.article1,
+            comment=self.comment)
+        self.comment.update_counters(replies=1)
+        reply.soft_delete()
+        reply.soft_delete()
+        self.comment.refresh_from_db()
+        self.assertEqual(self.comment.reply_count, 0)
+        reply.undo_soft_deletion()
+        self.comment.refresh_from_db()
+        self.assertEqual(self.comment.reply_count, 1)
+
+    def test_rebuild_comment_counters_command(self):
+        ThreadedComment.objects.create(
+            author=self.user1.profile, article=self.article1,
+            comment=self.comment)
+        ThreadedComment.objects.create(
+            author=self.user1.profile, article=self.article1,
+            comment=self.comment, is_active=False)
+        Snapshot.objects.create(comment=self.comment, body="old body")
+        call_command('rebuild_comment_counters', batch_size=1,
+                     stdout=StringIO())
+        self.comment.refresh_from_db()
+        self.assertEqual(self.comment.reply_count, 1)
+        self.assertEqual(self.comment.edit_count, 1)
+
+
+class UserArticleRelationTests(TestCase):
+
+    def setUp(self):
+        self.user1 = UserFactory.create()
+        self.article1 = ArticleFactory.create(author=self.user1.profile)
+
+    def test_a_user_relates_to_an_article_once(self):
+        relations = (
+            (Favorite, {'user_id': self.user1, 'article_id': self.article1}),
+            (Bookmark, {'user_id': self.user1, 'article_id': self.article1}),
+            (Like, {'user_id': self.user1, 'article_id': self.article1,
+                    'is_like': True}),
+            (Rating, {'user': self.user1, 'article': self.article1,
+                      'value': 3}),
+        )
+        for model, fields in relations:
+            model.objects.create(**fields)
+            with self.assertRaises(IntegrityError), transaction.atomic():
+                model.objects.create(**fields)
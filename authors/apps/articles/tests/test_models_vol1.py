@@ -1,8 +1,15 @@
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 
 from authors.apps.articles.models import Tag, Article, ReportArticle
 from authors.apps.authentication.models import User
 from authors.apps.articles.serializers import TheArticleSerializer
+from authors.apps.articles.utils import generate_unique_slug
 
 class ArticleModelTestCase(TestCase):
 
@@ -38,6 +45,56 @@ class ArticleModelTestCase(TestCase):
         username = self.report1.get_username()
         self.assertEqual(username, "Jake")
 
+    def test_reading_time_is_stored_on_save(self):
+        self.assertEqual(self.article_one.reading_minutes, 1)
+        self.article_one.body = "word " * 1000
+        self.article_one.save()
+        article = Article.objects.get(pk=self.article_one.pk)
+        self.assertEqual(article.reading_minutes, 4)
+        self.assertEqual(article.get_reading_time(), "4 minutes")
+
+    def test_reading_time_is_not_recomputed_for_unchanged_body(self):
+        article = Article.objects.get(pk=self.article_one.pk)
+        article.title = "A new title"
+        with mock.patch.object(Article, 'compute_reading_minutes') as compute:
+            article.save()
+        compute.assert_not_called()
+
+    def test_slugs_get_increasing_suffixes(self):
+        slugs = [Article.objects.create(
+            title="I am the OG", body="body",
+            author=self.user_one.profile).slug for _ in range(11)]
+        self.assertEqual(self.article_one.slug, "i-am-the-og")
+        self.assertEqual(slugs[0], "i-am-the-og-1")
+        self.assertEqual(slugs[-1], "i-am-the-og-11")
+        Article.objects.create(title="I am the OG too", body="body",
+                               author=self.user_one.profile)
+        article = Article(title="I am the OG", author=self.user_one.profile)
+        with self.assertNumQueries(1):
+            slug = generate_unique_slug(article, "title", "slug")
+        self.assertEqual(slug, "i-am-the-og-12")
+
+    def test_slug_is_reallocated_after_losing_a_race(self):
+        article = Article(title="I am the OG", body="body",
+                          author=self.user_one.profile)
+        taken = mock.Mock(side_effect=["i-am-the-og", "i-am-the-og-1"])
+        with mock.patch('authors.apps.articles.models.generate_unique_slug',
+                        taken):
+            article.save()
+        self.assertEqual(article.slug, "i-am-the-og-1")
+        self.assertEqual(taken.call_count, 2)
+
+    def test_backfill_reading_time_command(self):
+        Article.objects.update(reading_minutes=None)
+        Article.objects.create(
+            title="Longer", body="word " * 1000, author=self.user_one.profile)
+        Article.objects.filter(title="Longer").update(reading_minutes=None)
+        call_command('backfill_reading_time', batch_size=1, stdout=StringIO())
+        self.assertEqual(
+            Article.objects.get(pk=self.article_one.pk).reading_minutes, 1)
+        self.assertEqual(
+            Article.objects.get(title="Longer").reading_minutes, 4)
+
 
 class  TagModelTestCase(TestCase):
 
@@ -74,3 +131,26 @@ class  TagModelTestCase(TestCase):
         self.assertFalse(remove_tag)
         remove_tag = a_tag._remove_tags_without_articles("Etomovich")
         self.assertFalse(remove_tag)
+
+    def test_get_or_create_all_reuses_and_creates_tags(self):
+        existing = Tag.objects.create(tag="Andela")
+        tags = Tag.objects.get_or_create_all(["andela", "Django", "django"])
+        self.assertEqual([tag.slug for tag in tags], ["andela", "django"])
+        self.assertEqual(tags[0].pk, existing.pk)
+        self.assertEqual(Tag.objects.count(), 2)
+
+    def _update_tags_queries(self, names):
+        with CaptureQueriesContext(connection) as context:
+            Tag()._update_article_tags(self.article_one, names)
+        self.assertEqual(
+            sorted(tag.tag for tag in self.article_one.tags.all()),
+            sorted(names))
+        return len(context.captured_queries)
+
+    def test_update_article_tags_query_count_is_constant(self):
+        self._update_tags_queries(["first"])
+        few = self._update_tags_queries([f"a{index}" for index in range(2)])
+        many = self._update_tags_queries([f"b{index}" for index in range(20)])
+        self.assertEqual(few, many)
+        # Tags replaced on the only article using them are deleted.
+        self.assertFalse(Tag.objects.filter(tag__startswith="a").exists())
@@ -17,12 +17,16 @@ urlpatterns = [
          name="publish_an_article"),
     path('<slug:slug>/like/', views.CreateRetrieveLikeView.as_view(),
          name="create_like"),
+    path('<slug:slug>/like/toggle/', views.ToggleLikeView.as_view(),
+         name="toggle_like"),
     path('<slug:slug>/like/<int:pk>/', views.UpdateDeleteLikeView.as_view(),
          name="update_like"),
     path('<slug:slug>/likes/', views.GetArticleLikesView.as_view(),
          name="get_likes"),
     path('<slug:article_slug>/comments/', views.CommentListCreateView.as_view(),
          name="list_create_comments"),
+    path('<slug:article_slug>/comments/<int:pk>/replies/',
+         views.CommentRepliesView.as_view(), name="comment_replies"),
     path('<slug:article_slug>/comments/<pk>/',
          views.CommentRetrieveEditDeleteView.as_view(),
          name="comment"),
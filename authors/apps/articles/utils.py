@@ -1,3 +1,6 @@
+import re
+
+from django.db.models.functions import Length
 from django.utils.text import slugify
 from rest_framework.response import Response
 from rest_framework import status
@@ -8,19 +11,29 @@ def generate_unique_slug(model_instance, slugable_field_name, slug_field_name):
     Takes a model instance, sluggable field name (such as 'title') of that
     model as string, slug field name (such as 'slug') of the model as string
     returns a unique slug as a string.
+
+    Taken slugs are `<slug>` and `<slug>-<n>`. A single query over the
+    indexed slug column fetches the one with the highest suffix, and the
+    next suffix is allocated after it.
     """
     slug = slugify(getattr(model_instance, slugable_field_name))
-    unique_slug = slug
-    extension = 1
     ModelClass = model_instance.__class__
 
-    while ModelClass._default_manager.filter(
-        **{slug_field_name: unique_slug}
-    ).exists():
-        unique_slug = '{}-{}'.format(slug, extension)
-        extension += 1
+    highest = ModelClass._default_manager.filter(**{
+        slug_field_name + '__startswith': slug,
+        slug_field_name + '__regex': r'^{}(-[0-9]+)?$'.format(re.escape(slug))
+    }).annotate(
+        slug_length=Length(slug_field_name)
+    ).order_by(
+        '-slug_length', '-' + slug_field_name
+    ).values_list(slug_field_name, flat=True).first()
 
-    return unique_slug
+    if highest is None:
+        return slug
+    if highest == slug:
+        return '{}-1'.format(slug)
+    extension = int(highest[len(slug) + 1:]) + 1
+    return '{}-{}'.format(slug, extension)
 
 
 def edit_article(instance, request, the_data, tag_instance=None):
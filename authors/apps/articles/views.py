@@ -1,17 +1,24 @@
+from collections import OrderedDict
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Max, Q, Sum
+from django.urls import reverse
 from rest_framework import generics, mixins
 from rest_framework.generics import get_object_or_404
 from rest_framework.pagination import LimitOffsetPagination
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
+from rest_framework.utils.serializer_helpers import ReturnDict
 from rest_framework.views import APIView, status
 
+from . import cache as article_cache
 from .permissions import CanCreateComment, CanEditComment
 from .renderers import (ArticleJSONRenderer, CommentJSONRenderer,
                         ReportJSONRenderer, SearchJSONRenderer)
 from .serializers import (ArticleCommentInputSerializer,
                           CommentCommentInputSerializer,
                           EmbededCommentOutputSerializer,
-                          LikesSerializer,
+                          LikesSerializer, LikeToggleSerializer,
                           TheArticleSerializer,
                           ThreadedCommentOutputSerializer,
                           FavoriteSerializer, RatingSerializer,
@@ -19,8 +26,13 @@ from .serializers import (ArticleCommentInputSerializer,
                           PersonalArticlesSerializer, ReportSerializer)
 from .models import (Article, Bookmark, Like,
                      ThreadedComment, Favorite, Rating,
-                     Tag, ReportArticle)
+                     ReportArticle)
+from authors.apps.core.conditional import conditional_get
+from authors.apps.core.pagination import KeysetPagination
 from authors.apps.core.views import BaseManageView
+from authors.apps.profiles.models import Profile
+from authors.apps.profiles.serializers import (annotate_following,
+                                               is_following)
 from ..articles.utils import edit_article
 
 
@@ -36,15 +48,10 @@ class CreateArticleView(mixins.CreateModelMixin,
 
     def create(self, request, *args, **kwargs):
         payload = request.data.get('article', {})
-        the_tags = payload.get("tagList", None)
-        tags_pk = []
+        the_tags = payload.pop("tagList", None)
         if the_tags:
-            the_tags = payload.pop("tagList")
-            tag_object = Tag()
-            for item in the_tags:
-                my_tag = tag_object._create_tag(item)
-                tags_pk.append(my_tag.pk)
-            payload["tags"] = tags_pk
+            # Tags are created in bulk when the article is saved.
+            payload["tags"] = the_tags
 
         # Decode token
         serializer = TheArticleSerializer(
@@ -83,15 +90,26 @@ class GetArticlesView(mixins.ListModelMixin, generics.GenericAPIView):
     def get(self, request, *args, **kwargs):
         return self.list(request, *args, **kwargs)
 
+    def get_paginator(self, request):
+        """Return a keyset paginator for `?pagination=cursor`, otherwise
+        the default limit/offset paginator."""
+        if request.query_params.get('pagination') == 'cursor':
+            return KeysetPagination()
+        return self.pagination_class()
+
     def list(self, request, *args, **kwargs):
         # Decode token
         reply_not_found = {}
-        paginator = self.pagination_class()
-        published_articles = Article.objects.filter(
-            published=True, activated=True)
+        paginator = self.get_paginator(request)
+        published_articles = Article.objects.published().for_feed()
         page = paginator.paginate_queryset(published_articles, request)
 
-        if (len(published_articles) < 1):
+        if isinstance(paginator, KeysetPagination):
+            no_articles = not page and paginator.cursor is None
+        else:
+            # Reuse the COUNT(*) the paginator has already run.
+            no_articles = paginator.count == 0
+        if no_articles:
             reply_not_found["detail"] = "No articles have been found."
             return Response(
                 reply_not_found,
@@ -112,21 +130,19 @@ class GetAnArticleView(mixins.RetrieveModelMixin,
     renderer_classes = (ArticleJSONRenderer,)
     serializer_class = (TheArticleSerializer)
 
+    @conditional_get
     def get(self, request, slug):
-        '''Get a single article'''
-        found_article = Article.objects.filter(
-            slug=slug, published=True,
-            activated=True
-        ).first()
-
-        if found_article is not None:
-            serialized = self.serializer_class(
-                found_article, context={
-                    "current_user": request.user,
-                    "request": request}
-            )
+        '''Get a single article. The payload is cached for every viewer
+        and only `following` is worked out per request.'''
+        cached = article_cache.get_or_build(
+            request, slug, lambda: self.build_payload(request, slug))
+
+        if cached is not None:
+            author_id, data = cached
+            data['author']['following'] = is_following(
+                request.user, author_id)
             return Response(
-                serialized.data,
+                ReturnDict(data, serializer=None),
                 status=status.HTTP_200_OK
             )
         not_found = {}
@@ -136,6 +152,34 @@ class GetAnArticleView(mixins.RetrieveModelMixin,
             status=status.HTTP_404_NOT_FOUND
         )
 
+    def build_payload(self, request, slug):
+        '''Return the author id and the viewer independent payload of a
+        published article, or None when there is none.'''
+        found_article = Article.objects.published().for_feed().filter(
+            slug=slug).first()
+        if found_article is None:
+            return None
+        serialized = self.serializer_class(
+            found_article, context={
+                "current_user": None,
+                "request": request}
+        )
+        return found_article.author_id, dict(serialized.data)
+
+    def get_resource_state(self, request, slug):
+        '''Return what the payload of a published article depends on: its
+        and its author's `updated_at`, its counters, which change without
+        touching `updated_at`, its cache version, which also follows its
+        tags, and whether the viewer follows the author. None when there
+        is no such article.'''
+        articles = Article.objects.published().filter(slug=slug).values(
+            'updated_at', 'author__updated_at', *Article.AGGREGATE_FIELDS)
+        state = annotate_following(
+            articles, request.user, 'author_id').first()
+        if state is not None:
+            state['version'] = article_cache.article_version(slug)
+        return state
+
 
 class UpdateAnArticleView(mixins.UpdateModelMixin,
                           generics.GenericAPIView):
@@ -148,15 +192,9 @@ class UpdateAnArticleView(mixins.UpdateModelMixin,
     def put(self, request, *args, **kwargs):
         '''This method method updates field of model article'''
         my_data = request.data.get('article', {})
-        the_tags = my_data.get("tagList", None)
-        tags_pk = []
+        the_tags = my_data.pop("tagList", None)
         if the_tags:
-            the_tags = my_data.pop("tagList")
-            tag_object = Tag()
-            for item in the_tags:
-                my_tag = tag_object._create_tag(item)
-                tags_pk.append(my_tag.pk)
-            my_data["tags"] = tags_pk
+            my_data["tags"] = the_tags
 
         return edit_article(self, request, my_data)
 
@@ -199,7 +237,7 @@ class CreateLikeView(generics.CreateAPIView):
 
     def create(self, request, slug):
         """Creates a like"""
-        data = request.data
+        data = request.data.copy()
         article = Article.objects.filter(
             slug=slug, published=True, activated=True).first()
         if article is None:
@@ -208,20 +246,21 @@ class CreateLikeView(generics.CreateAPIView):
             }
             return Response(data=not_found, status=status.HTTP_404_NOT_FOUND)
 
-        like = Like.objects.filter(
-            user_id=request.user.pk, article_id=article.id).first()
-        if like is not None:
+        data['article_id'] = article.id
+        data['user_id'] = request.user.pk
+        serializer = self.get_serializer(data=data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            with transaction.atomic():
+                like = serializer.save()
+                article.update_like_counts(*like.count_deltas())
+        except IntegrityError:
+            # The unique (user, article) constraint caught an existing like.
             like_found = {
                 "detail": "Article already liked or disliked, \
                     use another route to update."
             }
             return Response(data=like_found, status=status.HTTP_400_BAD_REQUEST)
-
-        data['article_id'] = article.id
-        data['user_id'] = request.user.pk
-        serializer = self.get_serializer(data=data)
-        serializer.is_valid(raise_exception=True)
-        self.perform_create(serializer)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
 
@@ -266,11 +305,9 @@ class GetAllLikesView(generics.RetrieveAPIView):
                 "detail": "This article has not been found."
             }
             return Response(data=not_found, status=status.HTTP_404_NOT_FOUND)
-        likes = Like.objects.filter(article_id=article.id, is_like=True)
-        dislikes = Like.objects.filter(article_id=article.id, is_like=False)
         like_data = {
-            "total_likes": len(likes),
-            "total_dislikes": len(dislikes)
+            "total_likes": article.like_count,
+            "total_dislikes": article.dislike_count
         }
         return Response(data=like_data, status=status.HTTP_200_OK)
 
@@ -279,36 +316,73 @@ class UpdateLikeView(generics.UpdateAPIView):
     """Perfom update on likes"""
     permission_classes = (IsAuthenticated,)
     serializer_class = LikesSerializer
-    queryset = Like.objects.all()
+    queryset = Like.objects.select_related('article_id')
 
     def patch(self, request, *args, **kwargs):
-        like_id = kwargs['pk']
-        like = Like.objects.filter(id=like_id).first()
-        if like:
-            like_owner_id = like.user_id.id
-            if like_owner_id != request.user.id:
+        with transaction.atomic():
+            like = get_object_or_404(
+                self.get_queryset().select_for_update(of=('self',)),
+                pk=kwargs['pk'])
+            if like.user_id_id != request.user.id:
                 message = {
                     "detail": "This user does not own this like"
                 }
                 return Response(data=message, status=status.HTTP_403_FORBIDDEN)
-        return self.partial_update(request, *args, **kwargs)
+            was_like = like.is_like
+            serializer = self.get_serializer(
+                like, data=request.data, partial=True)
+            serializer.is_valid(raise_exception=True)
+            # A like can only be switched between like and dislike.
+            like = serializer.save(user_id=like.user_id,
+                                   article_id=like.article_id)
+            if like.is_like != was_like:
+                switched = 1 if like.is_like else -1
+                like.article_id.update_like_counts(switched, -switched)
+        return Response(serializer.data)
 
 
 class DeleteLikeView(generics.DestroyAPIView):
     """Delete like"""
     permission_classes = (IsAuthenticated,)
     serializer_class = LikesSerializer
-    queryset = Like.objects.all()
+    queryset = Like.objects.select_related('article_id')
 
     def delete(self, request, *args, **kwargs):
-        like_id = kwargs['pk']
-        like = Like.objects.filter(id=like_id).first()
-        if like:
-            like_owner_id = like.user_id.id
-            if like_owner_id != request.user.id:
+        with transaction.atomic():
+            like = get_object_or_404(
+                self.get_queryset().select_for_update(of=('self',)),
+                pk=kwargs['pk'])
+            if like.user_id_id != request.user.id:
                 message = {"detail": "This user does not own this like"}
                 return Response(data=message, status=status.HTTP_403_FORBIDDEN)
-        return self.destroy(request, *args, **kwargs)
+            like.delete()
+            like.article_id.update_like_counts(*like.count_deltas(-1))
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class ToggleLikeView(APIView):
+    """Like, dislike or undo either in a single request"""
+    permission_classes = (IsAuthenticated,)
+
+    def post(self, request, slug):
+        article = Article.objects.filter(
+            slug=slug, published=True, activated=True).first()
+        if article is None:
+            not_found = {
+                "detail": "This article has not been found."
+            }
+            return Response(data=not_found, status=status.HTTP_404_NOT_FOUND)
+        serializer = LikeToggleSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        like = Like.objects.toggle(
+            request.user, article, serializer.validated_data['is_like'])
+        article.refresh_from_db(fields=['like_count', 'dislike_count'])
+        like_data = {
+            "is_like": "undefined" if like is None else like.is_like,
+            "likes": article.like_count,
+            "dislikes": article.dislike_count,
+        }
+        return Response(data=like_data, status=status.HTTP_200_OK)
 
 
 class CreateRetrieveLikeView(BaseManageView):
@@ -339,15 +413,9 @@ class GetArticleLikesView(APIView):
                 "detail": "This article has not been found."
             }
             return Response(data=not_found, status=status.HTTP_404_NOT_FOUND)
-        likes_queryset = Like.objects.filter(
-            is_like=True, article_id=article.id)
-        dislikes_queryset = Like.objects.filter(
-            is_like=False, article_id=article.id)
-        dislikes_count = dislikes_queryset.count()
-        likes_count = likes_queryset.count()
         likes_dislikes = {
-            "likes": likes_count,
-            "dislikes": dislikes_count,
+            "likes": article.like_count,
+            "dislikes": article.dislike_count,
         }
         return Response(data=likes_dislikes, status=status.HTTP_200_OK)
 
@@ -363,20 +431,84 @@ class FetchArticleMixin:
         return article
 
 
-class CommentListCreateView(FetchArticleMixin, APIView):
+class IncludeEditHistoryMixin:
+    """
+    Provide include_edit_history() for comment listings, which only load
+    snapshots when asked to with `?include=edit_history`.
+    """
+
+    def include_edit_history(self):
+        include = self.request.query_params.get('include', '')
+        return 'edit_history' in include.split(',')
+
+
+class CommentListCreateView(FetchArticleMixin, IncludeEditHistoryMixin,
+                            APIView):
     """
     Create new comment.
     """
     renderer_classes = (CommentJSONRenderer,)
     permission_classes = (CanCreateComment,)
+    pagination_class = KeysetPagination
+    # Replies shown under each comment, the rest are linked to.
+    inline_replies = 3
 
+    @conditional_get
     def get(self, request, *args, **kwargs):
+        """Return a page of top-level comments with their newest replies."""
         article = self.get_article()
-        comments = ThreadedComment.active_objects.for_article(article)
-        article_comments = comments.filter(comment__isnull=True)
+        edit_history = self.include_edit_history()
+        paginator = self.pagination_class()
+        top_level_comments = ThreadedComment.active_objects.for_article(
+            article).filter(comment__isnull=True).for_output(edit_history)
+        page = paginator.paginate_queryset(
+            top_level_comments, request, view=self)
+        ThreadedComment.active_objects.attach_replies(
+            page, self.inline_replies, edit_history)
+        for comment in page:
+            if comment.has_more_replies:
+                comment.more_comments = self.get_more_replies_url(
+                    article, comment)
         serializer = ThreadedCommentOutputSerializer(
-            article_comments, context={'current_user': request.user}, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+            page, many=True,
+            context={'current_user': request.user, 'request': request,
+                     'edit_history': edit_history})
+        return paginator.get_paginated_response(serializer.data)
+
+    def get_resource_state(self, request, *args, **kwargs):
+        """Return what the payload of the article's comments depends on:
+        when they and their authors' profiles last changed, how many there
+        are, and which of their authors the viewer follows. None when the
+        article has no comments. Adding, editing and deleting comments
+        move one of the first three."""
+        comments = ThreadedComment.active_objects.all_comments().filter(
+            article__slug=self.kwargs['article_slug'])
+        aggregates = {
+            'updated_at': Max('updated_at'),
+            'authors_updated_at': Max('author__updated_at'),
+            'count': Count('id'),
+        }
+        if request.user.is_authenticated:
+            # The number of comments by followed authors and the sum of
+            # their author ids change with any follow or unfollow of a
+            # commenter, and are read in the same query.
+            followed = Q(author__in=Profile.objects.filter(
+                followers__user=request.user).values('pk'))
+            aggregates['followed_comments'] = Count('id', filter=followed)
+            aggregates['followed_authors'] = Sum('author_id', filter=followed)
+        state = comments.aggregate(**aggregates)
+        if state['updated_at'] is None:
+            return None
+        return state
+
+    def get_more_replies_url(self, article, comment):
+        """Return the link to the replies after the inlined ones."""
+        url = self.request.build_absolute_uri(reverse(
+            'articles:comment_replies', args=[article.slug, comment.pk]))
+        if self.include_edit_history():
+            url += '?include=edit_history'
+        return self.pagination_class().get_url_after(
+            url, comment.replies[-1])
 
     def post(self, request, *args, **kwargs):
         data = request.data.copy()
@@ -393,6 +525,31 @@ class CommentListCreateView(FetchArticleMixin, APIView):
                         status=status.HTTP_201_CREATED)
 
 
+class CommentRepliesView(FetchArticleMixin, IncludeEditHistoryMixin,
+                         generics.ListAPIView):
+    """
+    List the replies to a comment a page at a time.
+    """
+    renderer_classes = (CommentJSONRenderer,)
+    permission_classes = (AllowAny,)
+    serializer_class = EmbededCommentOutputSerializer
+    pagination_class = KeysetPagination
+
+    def get_queryset(self):
+        article = self.get_article()
+        comment = get_object_or_404(
+            ThreadedComment.active_objects.for_article(article),
+            pk=self.kwargs['pk'])
+        return ThreadedComment.active_objects.for_comment(
+            comment).for_output(self.include_edit_history())
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['current_user'] = self.request.user
+        context['edit_history'] = self.include_edit_history()
+        return context
+
+
 class CommentRetrieveEditDeleteView(FetchArticleMixin,
                                     generics.GenericAPIView):
     renderer_classes = (CommentJSONRenderer,)
@@ -402,6 +559,7 @@ class CommentRetrieveEditDeleteView(FetchArticleMixin,
         article = self.get_article()
         return ThreadedComment.active_objects.for_article(article)
 
+    @conditional_get
     def get(self, request, *args, **kwargs):
         """Return single a comment."""
         comment = self.get_object()
@@ -409,6 +567,24 @@ class CommentRetrieveEditDeleteView(FetchArticleMixin,
             comment, context={'current_user': request.user})
         return Response(serializer.data, status=status.HTTP_200_OK)
 
+    def get_resource_state(self, request, *args, **kwargs):
+        """Return what the payload of a comment depends on: its and its
+        author's `updated_at`, its counters, when its replies last changed
+        and whether the viewer follows its author. None when there is no
+        such comment."""
+        try:
+            comments = ThreadedComment.active_objects.all_comments().filter(
+                article__slug=self.kwargs['article_slug'],
+                pk=self.kwargs['pk'])
+        except ValueError:
+            return None
+        comments = comments.annotate(
+            replies_updated_at=Max('comments__updated_at')).values(
+                'updated_at', 'author__updated_at', 'replies_updated_at',
+                *ThreadedComment.COUNTER_FIELDS)
+        return annotate_following(
+            comments, request.user, 'author_id').first()
+
     def post(self, request, *args, **kwargs):
         """Create a comment on another comment."""
         data = request.data.copy()
@@ -424,7 +600,9 @@ class CommentRetrieveEditDeleteView(FetchArticleMixin,
         data["article"] = article.id
         serializer = CommentCommentInputSerializer(data=data)
         serializer.is_valid(raise_exception=True)
-        comment = serializer.save()
+        with transaction.atomic():
+            comment = serializer.save()
+            commented_comment.update_counters(replies=1)
         response_serializer = EmbededCommentOutputSerializer(
             comment, context={'current_user': request.user})
         return Response(response_serializer.data, status.HTTP_201_CREATED)
@@ -473,7 +651,7 @@ class FavoriteView(generics.CreateAPIView):
 
     def post(self, request, slug):
         """Creates a favorite"""
-        data = request.data
+        data = request.data.copy()
         article = Article.objects.filter(
             slug=slug, published=True, activated=True).first()
         if article is None:
@@ -482,20 +660,19 @@ class FavoriteView(generics.CreateAPIView):
             }
             return Response(data=not_found, status=status.HTTP_404_NOT_FOUND)
 
-        favorite = Favorite.objects.filter(
-            user_id=request.user.pk, article_id=article.id).first()
-        if favorite is not None:
+        data['article_id'] = article.id
+        data['user_id'] = request.user.pk
+        serializer = self.get_serializer(data=data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            with transaction.atomic():
+                self.perform_create(serializer)
+        except IntegrityError:
             favorite_found = {
                 "detail": "Article already in favorites."
             }
             return Response(data=favorite_found,
                             status=status.HTTP_400_BAD_REQUEST)
-
-        data['article_id'] = article.id
-        data['user_id'] = request.user.pk
-        serializer = self.get_serializer(data=data)
-        serializer.is_valid(raise_exception=True)
-        self.perform_create(serializer)
         data = serializer.data
         data['detail'] = 'Article added to favorites.'
         return Response(data, status=status.HTTP_201_CREATED)
@@ -508,11 +685,10 @@ class FavoriteView(generics.CreateAPIView):
                 "detail": "This article has not been found."
             }
             return Response(data=not_found, status=status.HTTP_404_NOT_FOUND)
-        favorite = Favorite.objects.filter(
-            article_id=article.id, user_id=request.user.pk).first()
-        if favorite:
+        deleted, _ = Favorite.objects.filter(
+            article_id=article.id, user_id=request.user.pk).delete()
+        if deleted:
             message = {"detail": "Article removed from favorites"}
-            favorite.delete()
             return Response(data=message, status=status.HTTP_204_NO_CONTENT)
         not_found = {"detail": "Article not favorite"}
         return Response(not_found, status.HTTP_404_NOT_FOUND)
@@ -534,25 +710,40 @@ class FavoriteView(generics.CreateAPIView):
         return Response(not_found, status.HTTP_404_NOT_FOUND)
 
 
-class GetUserFavoritesView(APIView):
-    """Gets all users' favorite articles"""
+class SavedArticlesPagination(KeysetPagination):
+    """Pages through favorites or bookmarks, most recently saved first."""
+    ordering = ('-id',)
+
+
+class SavedArticlesListView(APIView):
+    """
+    Base view listing the articles the current user saved as `model`, a
+    cursor page at a time. Every article on a page is loaded in one joined
+    query plus one for the tags.
+    """
     permission_classes = (IsAuthenticated, )
+    pagination_class = SavedArticlesPagination
+    model = None
+    results_key = None
 
     def get(self, request):
-        favorites_queryset = Favorite.objects.filter(
-            user_id=request.user.id)
-
-        favorite_articles = []
-        for favorite in favorites_queryset:
-            article = TheArticleSerializer(
-                favorite.article_id,
-                context={"current_user": request.user, "request": request}
-            ).data
-            favorite_articles.append(article)
-        favorites = {
-            "favorites": favorite_articles
-        }
-        return Response(data=favorites, status=status.HTTP_200_OK)
+        paginator = self.pagination_class()
+        saved = self.model.objects.for_user(request.user).with_articles()
+        page = paginator.paginate_queryset(saved, request, view=self)
+        serializer = TheArticleSerializer(
+            [row.article_id for row in page], many=True,
+            context={"current_user": request.user, "request": request})
+        return Response(data=OrderedDict([
+            ('next', paginator.get_next_link()),
+            ('previous', paginator.get_previous_link()),
+            (self.results_key, serializer.data),
+        ]), status=status.HTTP_200_OK)
+
+
+class GetUserFavoritesView(SavedArticlesListView):
+    """Gets all users' favorite articles"""
+    model = Favorite
+    results_key = 'favorites'
 
 
 class RatingView(APIView):
@@ -567,13 +758,6 @@ class RatingView(APIView):
 
         try:
             article = self.serializer_class.get_article(slug)
-            count = Rating.objects.filter(article=article,
-                                          user=request.user.id).count()
-            if count > 0:
-                return Response({"message":
-                                 "You have already rated this article."},
-                                status=status.HTTP_403_FORBIDDEN)
-
             user_id = article.author_id
             article_id = article.id
 
@@ -593,7 +777,16 @@ class RatingView(APIView):
 
             serializer = RatingSerializer(data=data)
             serializer.is_valid(raise_exception=True)
-            serializer.save()
+            try:
+                with transaction.atomic():
+                    serializer.save()
+                    article.update_rating_aggregate(
+                        serializer.validated_data['value'], count_delta=1)
+            except IntegrityError:
+                # The unique (user, article) constraint caught a rating.
+                return Response({"message":
+                                 "You have already rated this article."},
+                                status=status.HTTP_403_FORBIDDEN)
             return Response({"message":
                              "Article rated."},
                             status=status.HTTP_201_CREATED)
@@ -605,14 +798,19 @@ class RatingView(APIView):
     def put(self, request, slug):
         try:
             article = self.serializer_class.get_article(slug)
-            rating = Rating.objects.get(
-                article=article.id, user=request.user.id)
             data = request.data.get('rating')
 
-            serializer = RatingSerializer(
-                instance=rating, data=data, partial=True)
-            serializer.is_valid(raise_exception=True)
-            serializer.save()
+            with transaction.atomic():
+                # Lock the rating so concurrent updates apply their deltas
+                # to the article aggregate one at a time.
+                rating = Rating.objects.select_for_update().get(
+                    article=article.id, user=request.user.id)
+                previous_value = rating.value
+                serializer = RatingSerializer(
+                    instance=rating, data=data, partial=True)
+                serializer.is_valid(raise_exception=True)
+                rating = serializer.save()
+                article.update_rating_aggregate(rating.value - previous_value)
             return Response({"message": "Rating updated."})
 
         except Article.DoesNotExist:
@@ -632,7 +830,8 @@ class GetRatingView(APIView):
     def get(self, request, slug):
         try:
             article = self.serializer_class.get_article(slug)
-            rating_queryset = Rating.objects.filter(article=article)
+            rating_queryset = Rating.objects.filter(
+                article=article).select_related('user__profile')
             paginator = self.pagination_class()
             page = paginator.paginate_queryset(rating_queryset, request)
             serializer = ArticleRatingSerializer(page,
@@ -666,34 +865,32 @@ class BookmarkView(generics.CreateAPIView):
 
     def post(self, request, **kwargs):
         """Creates a bookmark"""
-        data = request.data
+        data = request.data.copy()
         article = get_object_or_404(
             Article, slug=kwargs['slug'], published=True, activated=True)
-        bookmark = Bookmark.objects.filter(
-            user_id=request.user.pk, article_id=article.id).first()
-        if bookmark is not None:
+        data['article_id'] = article.id
+        data['user_id'] = request.user.pk
+        serializer = self.get_serializer(data=data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            with transaction.atomic():
+                self.perform_create(serializer)
+        except IntegrityError:
             favorite_found = {
                 "detail": "Article already bookmarked."
             }
             return Response(data=favorite_found,
                             status=status.HTTP_400_BAD_REQUEST)
-
-        data['article_id'] = article.id
-        data['user_id'] = request.user.pk
-        serializer = self.get_serializer(data=data)
-        serializer.is_valid(raise_exception=True)
-        self.perform_create(serializer)
         data['detail'] = 'Article added to bookmarks.'
         return Response(data, status=status.HTTP_201_CREATED)
 
     def delete(self, request, *args, **kwargs):
         article = get_object_or_404(
             Article, slug=kwargs['slug'], published=True, activated=True)
-        favorite = Bookmark.objects.filter(
-            article_id=article.id, user_id=request.user.pk).first()
-        if favorite:
+        deleted, _ = Bookmark.objects.filter(
+            article_id=article.id, user_id=request.user.pk).delete()
+        if deleted:
             message = {"detail": "Article removed from bookmarked articles"}
-            favorite.delete()
             return Response(data=message, status=status.HTTP_204_NO_CONTENT)
         not_found = {"detail": "Article not bookmarked"}
         return Response(not_found, status.HTTP_404_NOT_FOUND)
@@ -710,24 +907,10 @@ class BookmarkView(generics.CreateAPIView):
         return Response(not_found, status.HTTP_404_NOT_FOUND)
 
 
-class GetUserBookmarksView(APIView):
+class GetUserBookmarksView(SavedArticlesListView):
     """Gets all bookmarked articles"""
-    permission_classes = (IsAuthenticated, )
-
-    def get(self, request):
-        bookmarks_queryset = Bookmark.objects.filter(
-            user_id=request.user.id)
-
-        bookmarked_articles = []
-        for bookmark in bookmarks_queryset:
-            article = TheArticleSerializer(bookmark.article_id, context={
-                                           "current_user": request.user,
-                                           "request": request}).data
-            bookmarked_articles.append(article)
-        bookmarks = {
-            "bookmarks": bookmarked_articles
-        }
-        return Response(data=bookmarks, status=status.HTTP_200_OK)
+    model = Bookmark
+    results_key = 'bookmarks'
 
 
 class GetAllArticleReports(generics.ListAPIView):
@@ -808,46 +991,14 @@ class SearchForArticles(generics.ListAPIView):
         [tags, author, title, description,body] if either is
         supplied else it returns all articles given the search_string'''
         search_string = request.query_params.get('query', None)
-        payload = []
         if not search_string:
             reply = {
                 "message": "Please enter a search string."
             }
             return Response(reply, status=status.HTTP_400_BAD_REQUEST)
 
-        if slug == "author":
-            payload = Article.objects.filter(
-                author__user__username__icontains=search_string, published=True,
-                activated=True
-            )
-        if slug == "title":
-            payload = Article.objects.filter(
-                title__icontains=search_string, published=True,
-                activated=True
-            )
-        if slug == "body":
-            payload = Article.objects.filter(
-                body__icontains=search_string, published=True,
-                activated=True
-            )
-        if slug == "description":
-            payload = Article.objects.filter(
-                description__icontains=search_string, published=True,
-                activated=True
-            )
-        matching_tags = []
-        matching_tags = list(Tag.objects.filter(
-            tag__icontains=search_string
-        ))
-        if matching_tags and slug == "tags":
-            for item in matching_tags:
-                query = Article.objects.filter(
-                    tags__id__icontains=item.id, published=True,
-                    activated=True
-                )
-                payload = list(
-                    set(payload + list(query))
-                )
+        payload = Article.objects.published().for_feed().search(
+            slug, search_string)
 
         paginator = self.pagination_class()
         page = paginator.paginate_queryset(payload, request)
@@ -4,6 +4,8 @@ from django.conf import settings
 
 from rest_framework import authentication, exceptions
 
+from . import user_cache
+from .tokens import denylist
 from .models import User
 
 
@@ -71,8 +73,17 @@ class JWTAuthentication(authentication.BaseAuthentication):
             msg = 'Invalid token provided. Authentication failure.'
             raise exceptions.AuthenticationFailed(msg)
 
+        # Tokens without an id predate revocation and are not accepted.
+        if 'jti' not in payload:
+            msg = 'Invalid token provided. Authentication failure.'
+            raise exceptions.AuthenticationFailed(msg)
+
+        if payload['jti'] in denylist:
+            msg = 'This token has been revoked.'
+            raise exceptions.AuthenticationFailed(msg)
+
         try:
-            user = User.objects.get(pk=payload['id'])
+            user = self._get_user(payload['id'])
         except User.DoesNotExist:
             msg = 'User matching this token was not found.'
             raise exceptions.AuthenticationFailed(msg)
@@ -82,3 +93,16 @@ class JWTAuthentication(authentication.BaseAuthentication):
             raise exceptions.AuthenticationFailed(msg)
 
         return (user, token)
+
+    def _get_user(self, user_id):
+        """
+        Return the user with `user_id`. With `JWT_USER_CACHE` set, only the
+        fields checked here come from the cache and the rest are loaded
+        when first read.
+        """
+        if not user_cache.enabled():
+            return User.objects.get(pk=user_id)
+        state = user_cache.get_state(user_id)
+        if state is None:
+            raise User.DoesNotExist
+        return user_cache.build_user(state)
@@ -0,0 +1,60 @@
+"""
+Password hashing policy.
+
+Passwords are hashed with PBKDF2 at `PASSWORD_HASH_ITERATIONS` rounds.
+Django rehashes a stored password whose round count differs from the
+policy the next time its user logs in, so raising or lowering the
+setting moves existing users over one login at a time.
+
+With `PASSWORD_HASH_WORKERS` set, hashing runs in a process pool of that
+size rather than in the request thread. A burst of logins then waits its
+turn for the pool instead of taking every core from the requests the
+same server is handling.
+"""
+import base64
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+from django.utils.crypto import pbkdf2
+
+_pool = None
+
+
+def _pbkdf2_sha256(password, salt, iterations):
+    return pbkdf2(password, salt, iterations, digest=hashlib.sha256)
+
+
+def run_hashing(function, *args):
+    """Return `function(*args)`, computed in the hashing pool when there
+    is one."""
+    global _pool
+    if not settings.PASSWORD_HASH_WORKERS:
+        return function(*args)
+    if _pool is None:
+        _pool = ProcessPoolExecutor(
+            max_workers=settings.PASSWORD_HASH_WORKERS)
+    try:
+        return _pool.submit(function, *args).result()
+    except BrokenProcessPool:
+        # A worker died, start a new pool for the next hash.
+        _pool = None
+        return function(*args)
+
+
+class PolicyPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """PBKDF2 hasher following the hashing policy in the settings."""
+
+    @property
+    def iterations(self):
+        return settings.PASSWORD_HASH_ITERATIONS
+
+    def encode(self, password, salt, iterations=None):
+        assert password is not None
+        assert salt and '$' not in salt
+        iterations = iterations or self.iterations
+        hash = run_hashing(_pbkdf2_sha256, password, salt, iterations)
+        hash = base64.b64encode(hash).decode('ascii').strip()
+        return "%s$%d$%s$%s" % (self.algorithm, iterations, salt, hash)
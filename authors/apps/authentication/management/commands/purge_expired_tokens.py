@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from ...models import PasswordResetToken, RefreshToken, RevokedAccessToken
+
+
+class Command(BaseCommand):
+    """Delete the password reset tokens, refresh tokens and access token
+    revocations that have expired.
+
+    Expired rows are deleted a batch at a time, each batch in its own
+    short transaction, so a large backlog doesn't hold long locks on the
+    tables logins and password resets write to. Run it periodically.
+    """
+    help = 'Delete expired password reset and refresh tokens.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Number of rows deleted per batch.')
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        for model in (PasswordResetToken, RefreshToken, RevokedAccessToken):
+            deleted = self.purge(model, now, options['batch_size'])
+            self.stdout.write(
+                self.style.SUCCESS(f'Deleted {deleted} expired '
+                                   f'{model._meta.verbose_name_plural}.'))
+
+    def purge(self, model, now, batch_size):
+        """Delete the rows of `model` that expired by `now` and return how
+        many there were."""
+        expired = model.objects.filter(expires_at__lte=now).order_by('pk')
+        deleted = 0
+        while True:
+            batch = list(expired.values_list('pk', flat=True)[:batch_size])
+            if not batch:
+                return deleted
+            deleted += model.objects.filter(pk__in=batch).delete()[0]
@@ -1,11 +1,18 @@
 from datetime import datetime, timedelta
+from uuid import uuid4
 
 import jwt
 
 from django.conf import settings
 from django.contrib.auth.models import (AbstractBaseUser, BaseUserManager,
                                         PermissionsMixin)
-from django.db import models
+from django.db import models, transaction
+from django.db.models.signals import post_delete, post_save
+from django.utils import timezone
+
+from authors.apps.core.models import LoadDeferredTogetherMixin
+
+from . import user_cache
 
 
 class UserManager(BaseUserManager):
@@ -32,6 +39,12 @@ class UserManager(BaseUserManager):
 
         return user
 
+    def get_by_natural_key(self, username):
+        """Return the user logging in with `username`, their email, with
+        the profile the login response includes joined."""
+        return self.select_related('profile').get(
+            **{self.model.USERNAME_FIELD: username})
+
     def create_superuser(self, username, email, password):
         """
         Create and return a `User` with superuser powers.
@@ -51,7 +64,7 @@ class UserManager(BaseUserManager):
         return user
 
 
-class User(AbstractBaseUser, PermissionsMixin):
+class User(LoadDeferredTogetherMixin, AbstractBaseUser, PermissionsMixin):
     # Each `User` needs a human-readable unique identifier that we can use to
     # represent the `User` in the UI. We want to index this column in the
     # database to improve lookup performance.
@@ -127,34 +140,89 @@ class User(AbstractBaseUser, PermissionsMixin):
         We need to make the method for creating our token private. At the
         same time, it's more convenient for us to access our token with
         `user.token` and so we make the token a dynamic property by wrapping
-        in in the `@property` decorator.
+        in in the `@property` decorator. Every read issues a new access
+        token, so only login and refresh should read it.
         """
         return self._generate_jwt_token()
 
     def _generate_jwt_token(self):
         """
-        We generate JWT token and add the user id, username and expiration
-        as an integer.
+        We generate a short-lived access token and add the user id,
+        username, expiration as an integer and a unique id, `jti`, by
+        which the token can be revoked.
         """
-        token_expiry = datetime.now() + timedelta(days=365)
+        token_expiry = datetime.now() + timedelta(
+            seconds=settings.JWT_ACCESS_TOKEN_LIFETIME)
 
         token = jwt.encode({
             'id': self.pk,
             'username': self.get_full_name,
-            'exp': int(token_expiry.strftime('%s'))
+            'exp': int(token_expiry.strftime('%s')),
+            'jti': uuid4().hex
         }, settings.SECRET_KEY, algorithm='HS256')
 
         return token.decode('utf-8')
 
 
+class PasswordResetTokenQuerySet(models.QuerySet):
+
+    def issue(self, user, digest):
+        """Store the token with `digest` for `user`, invalidating the
+        tokens issued to them before."""
+        with transaction.atomic():
+            self.filter(user=user, is_valid=True).update(is_valid=False)
+            return self.create(
+                user=user, digest=digest,
+                expires_at=timezone.now() + timedelta(
+                    seconds=settings.PASSWORD_RESET_TOKEN_LIFETIME))
+
+
 class PasswordResetToken(models.Model):
-    """This class creates a Password Reset Token model."""
+    """This class creates a Password Reset Token model. Tokens are
+    stored as the SHA-256 digest of their value."""
 
     user = models.ForeignKey(
         User,
         related_name='password_reset_token',
         on_delete=models.CASCADE
     )
-    token = models.TextField()
+    # Not unique, as a link requested twice within a second carries the
+    # same token.
+    digest = models.CharField(max_length=64, db_index=True)
     created = models.DateTimeField(auto_now=True)
+    expires_at = models.DateTimeField(db_index=True)
     is_valid = models.BooleanField(default=True)
+
+    objects = PasswordResetTokenQuerySet.as_manager()
+
+
+class RefreshToken(models.Model):
+    """A refresh token, stored as the SHA-256 digest of its value. Each
+    one is deleted when it is traded for new tokens."""
+
+    user = models.ForeignKey(
+        User,
+        related_name='refresh_tokens',
+        on_delete=models.CASCADE
+    )
+    digest = models.CharField(max_length=64, unique=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+
+class RevokedAccessToken(models.Model):
+    """An access token revoked before it expires, by its `jti`."""
+
+    jti = models.CharField(max_length=32, unique=True)
+    revoked_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+
+def invalidate_cached_user(sender, instance, **kwargs):
+    """Drop the state JWT authentication cached for a saved or deleted
+    user, so deactivations apply to their next request."""
+    user_cache.invalidate(instance.pk)
+
+
+post_save.connect(invalidate_cached_user, sender=User)
+post_delete.connect(invalidate_cached_user, sender=User)
@@ -4,6 +4,7 @@ from rest_framework import serializers
 from rest_framework.validators import UniqueValidator
 
 from .models import User, PasswordResetToken
+from .tokens import digest
 from authors.apps.profiles.serializers import ProfileSerializer
 
 
@@ -140,7 +141,9 @@ class LoginSerializer(serializers.Serializer):
         # it is worth checking for. Raise an exception in this case.
         # The `validate` method should return a dictionary of validated data.
         # This is the data that is passed to the `create` and `update` methods
-        # that we will see later on.
+        # that we will see later on. The user itself is kept so the login
+        # view can respond without looking it up again.
+        self.user = user
         return {
             'email': user.email,
             'username': user.username,
@@ -161,10 +164,13 @@ class UserSerializer(serializers.ModelSerializer):
         write_only=True
     )
     profile = ProfileSerializer()
+    token = serializers.SerializerMethodField()
+    refresh_token = serializers.SerializerMethodField()
 
     class Meta:
         model = User
-        fields = ('email', 'username', 'password', 'token', 'profile')
+        fields = ('email', 'username', 'password', 'token',
+                  'refresh_token', 'profile')
 
         # The `read_only_fields` option is an alternative for explicitly
         # specifying the field with `read_only=True` like we did for password
@@ -176,6 +182,15 @@ class UserSerializer(serializers.ModelSerializer):
 
         read_only_fields = ('token',)
 
+    def get_token(self, instance):
+        """Return the access token issued in this request, passed in the
+        context as `token`. Tokens are only issued on login and refresh."""
+        return self.context.get('token')
+
+    def get_refresh_token(self, instance):
+        """Return the refresh token issued in this request, if any."""
+        return self.context.get('refresh_token')
+
     def update(self, instance, validated_data):
         """Performs an update on a User."""
 
@@ -306,8 +321,21 @@ class PasswordChangeSerializer(serializers.ModelSerializer):
         fields = ['password']
 
 
+class RefreshTokenSerializer(serializers.Serializer):
+    """Holds the refresh token sent to be traded or revoked."""
+    refresh_token = serializers.CharField(max_length=255)
+
+
 class PasswordResetTokenSerializer(serializers.ModelSerializer):
     """Handles serialization and deserialization of password reset token."""
+    token = serializers.CharField(write_only=True)
+
     class Meta:
         model = PasswordResetToken
         fields = ['user', 'token', 'is_valid']
+
+    def create(self, validated_data):
+        """Store the digest of the token, which replaces the user's
+        previous tokens."""
+        return PasswordResetToken.objects.issue(
+            validated_data['user'], digest(validated_data['token']))
@@ -0,0 +1,93 @@
+"""
+Benchmarks for the authentication app.
+
+They are not collected by the default test run. Run them explicitly with:
+
+    python manage.py test authors.apps.authentication.tests.benchmarks \
+        --settings=authors.settings.test
+"""
+import time
+
+from django.contrib.auth import authenticate
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory
+
+from ..models import User
+from ..serializers import UserSerializer
+from ..views import LoginAPIView
+
+
+class LegacyLoginAPIView(LoginAPIView):
+    """The login view as it was, looking the user up again after
+    authenticating it and signing a second token for the response."""
+
+    def post(self, request):
+        serializer = self.serializer_class(data=request.data.get('user', {}))
+        serializer.is_valid(raise_exception=True)
+        instance = User.objects.get(
+            username=serializer.data.get('username'))
+        user_serializer = UserSerializer(
+            instance, context={'current_user': request.user})
+        return Response(user_serializer.data)
+
+
+class LoginBenchmark(TestCase):
+    """Login throughput and queries of the old and new login views."""
+    logins = 200
+
+    def setUp(self):
+        user = User.objects.create_user(
+            username='bench', email='bench@mail.com', password='password')
+        user.is_verified = True
+        user.save()
+        self.factory = APIRequestFactory()
+
+    def _login(self, view):
+        request = self.factory.post(
+            reverse('authentication:login'),
+            {'user': {'email': 'bench@mail.com', 'password': 'password'}},
+            format='json')
+        return view(request)
+
+    def test_login_throughput(self):
+        print()
+        for name, view_class in (('legacy', LegacyLoginAPIView),
+                                 ('current', LoginAPIView)):
+            view = view_class.as_view()
+            with CaptureQueriesContext(connection) as context:
+                self._login(view)
+            start = time.perf_counter()
+            for _ in range(self.logins):
+                self._login(view)
+            elapsed = time.perf_counter() - start
+            print(f'{name}: {self.logins / elapsed:.1f} logins/s, '
+                  f'{len(context.captured_queries)} queries per login')
+
+
+class PasswordHashingBenchmark(TestCase):
+    """Logins per second under several hashing policies, hashing in the
+    request thread and in a pool of two processes."""
+    logins = 20
+    policies = (30000, 60000, 120000, 240000)
+
+    def test_logins_per_policy(self):
+        print()
+        for iterations in self.policies:
+            for workers in (0, 2):
+                with override_settings(PASSWORD_HASH_ITERATIONS=iterations,
+                                       PASSWORD_HASH_WORKERS=workers):
+                    User.objects.all().delete()
+                    User.objects.create_user(
+                        username='bench', email='bench@mail.com',
+                        password='password')
+                    start = time.perf_counter()
+                    for _ in range(self.logins):
+                        authenticate(username='bench@mail.com',
+                                     password='password')
+                    elapsed = time.perf_counter() - start
+                print(f'{iterations} iterations, {workers} hashing '
+                      f'processes: {self.logins / elapsed:.1f} logins/s')
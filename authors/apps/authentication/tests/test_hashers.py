@@ -0,0 +1,45 @@
+from django.contrib.auth import authenticate
+from django.contrib.auth.hashers import check_password, make_password
+from django.test import TestCase, override_settings
+
+from authors.apps.authentication.models import User
+
+
+class PasswordHashingPolicyTest(TestCase):
+    """Stored hashes follow the hashing policy in the settings."""
+
+    def _iterations(self, user):
+        user.refresh_from_db()
+        return int(user.password.split('$')[1])
+
+    @override_settings(PASSWORD_HASH_ITERATIONS=1000)
+    def _create_user(self):
+        user = User.objects.create_user(
+            username='hashed', email='hashed@mail.com', password='password')
+        self.assertEqual(self._iterations(user), 1000)
+        return user
+
+    def test_stored_hashes_are_upgraded_on_login(self):
+        user = self._create_user()
+        with override_settings(PASSWORD_HASH_ITERATIONS=2000):
+            authenticate(username='hashed@mail.com', password='password')
+        self.assertEqual(self._iterations(user), 2000)
+
+    def test_stored_hashes_are_downgraded_on_login(self):
+        user = self._create_user()
+        with override_settings(PASSWORD_HASH_ITERATIONS=500):
+            authenticate(username='hashed@mail.com', password='password')
+        self.assertEqual(self._iterations(user), 500)
+
+    def test_failed_logins_leave_the_hash_alone(self):
+        user = self._create_user()
+        with override_settings(PASSWORD_HASH_ITERATIONS=2000):
+            authenticate(username='hashed@mail.com', password='wrong')
+        self.assertEqual(self._iterations(user), 1000)
+
+    @override_settings(PASSWORD_HASH_ITERATIONS=1000, PASSWORD_HASH_WORKERS=1)
+    def test_pool_hashes_match_inline_hashes(self):
+        encoded = make_password('password', salt='salt')
+        with override_settings(PASSWORD_HASH_WORKERS=0):
+            self.assertEqual(make_password('password', salt='salt'), encoded)
+        self.assertTrue(check_password('password', encoded))
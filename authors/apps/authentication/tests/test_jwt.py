@@ -1,11 +1,18 @@
-from django.test import TestCase
+import jwt
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
-from rest_framework import status
+from rest_framework import exceptions, status
 from rest_framework.test import APIClient, APIRequestFactory
 
 from authors.apps.authentication.models import User
 from authors.apps.authentication.backends import JWTAuthentication
+from authors.apps.authentication import tokens, user_cache
 
 
 class JWTAuthenticationTest(TestCase):
@@ -121,3 +128,117 @@ class JWTAuthenticationTest(TestCase):
         request.META['HTTP_AUTHORIZATION'] = 'Token, {}'.format(self.user_token)
         res = jwt_auth.authenticate(request)
         self.assertEqual(res, None)
+
+    def test_tokens_without_an_id_are_rejected(self):
+        """Tokens issued before tokens could be revoked carry no `jti`"""
+        legacy_token = jwt.encode(
+            {'id': self.user.pk}, settings.SECRET_KEY).decode('utf-8')
+        headers = {'HTTP_AUTHORIZATION': f'Bearer {legacy_token}'}
+        res = self.client.get(reverse('authentication:get users'), **headers)
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(
+            res.data['detail'], 'Invalid token provided. Authentication failure.')
+
+
+class RefreshTokenTest(TestCase):
+    """Test trading refresh tokens and logging out"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='user3', email='user3@mail.com', password='password')
+        self.user.is_verified = True
+        self.user.save()
+        self.client = APIClient()
+        response = self.client.post(reverse('authentication:login'), {
+            'user': {'email': 'user3@mail.com', 'password': 'password'}},
+            format='json')
+        self.token = response.data['token']
+        self.refresh_token = response.data['refresh_token']
+
+    def _refresh(self, refresh_token):
+        return self.client.post(reverse('authentication:refresh-token'), {
+            'user': {'refresh_token': refresh_token}}, format='json')
+
+    def test_refresh_tokens_are_traded_for_new_tokens(self):
+        res = self._refresh(self.refresh_token)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(res.data['token'], self.token)
+        self.assertNotEqual(res.data['refresh_token'], self.refresh_token)
+        headers = {'HTTP_AUTHORIZATION': f'Bearer {res.data["token"]}'}
+        res = self.client.get(reverse('authentication:get users'), **headers)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_refresh_tokens_work_once(self):
+        self._refresh(self.refresh_token)
+        res = self._refresh(self.refresh_token)
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(
+            res.data['detail'], 'Invalid or expired refresh token.')
+
+    def test_logging_out_revokes_both_tokens(self):
+        headers = {'HTTP_AUTHORIZATION': f'Bearer {self.token}'}
+        res = self.client.post(reverse('authentication:logout'), {
+            'user': {'refresh_token': self.refresh_token}}, format='json',
+            **headers)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        res = self.client.get(reverse('authentication:get users'), **headers)
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(res.data['detail'], 'This token has been revoked.')
+        res = self._refresh(self.refresh_token)
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_logging_out_leaves_other_users_refresh_tokens(self):
+        other = User.objects.create_user(
+            username='user4', email='user4@mail.com', password='password')
+        headers = {'HTTP_AUTHORIZATION': f'Bearer {other.token}'}
+        res = self.client.post(reverse('authentication:logout'), {
+            'user': {'refresh_token': self.refresh_token}}, format='json',
+            **headers)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        res = self._refresh(self.refresh_token)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+
+@override_settings(JWT_USER_CACHE='default')
+class CachedUserAuthenticationTest(TestCase):
+    """With `JWT_USER_CACHE` set, authentication reads users from the
+    cache and loads the rest of the user only when it is read."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='cached', email='cached@mail.com', password='password')
+        cache.clear()
+        user_cache.invalidate(self.user.pk)
+        # Keeps the denylist from syncing during the measured calls.
+        tokens.denylist.sync(force=True)
+        self.factory = APIRequestFactory()
+
+    def _authenticate(self):
+        request = self.factory.get(reverse('authentication:get users'))
+        request.META['HTTP_AUTHORIZATION'] = f'Bearer {self.user.token}'
+        with CaptureQueriesContext(connection) as context:
+            user, _ = JWTAuthentication().authenticate(request)
+        return user, len(context.captured_queries)
+
+    def test_users_are_loaded_once(self):
+        _, queries = self._authenticate()
+        self.assertEqual(queries, 1)
+        user, queries = self._authenticate()
+        self.assertEqual(queries, 0)
+        self.assertEqual(user.username, 'cached')
+        self.assertEqual(user.profile.pk, self.user.profile.pk)
+
+    def test_other_fields_are_loaded_together_when_read(self):
+        self._authenticate()
+        user, _ = self._authenticate()
+        with CaptureQueriesContext(connection) as context:
+            self.assertEqual(user.email, 'cached@mail.com')
+            self.assertFalse(user.is_staff)
+        self.assertEqual(len(context.captured_queries), 1)
+
+    def test_deactivated_users_are_rejected_right_away(self):
+        self._authenticate()
+        self.user.is_active = False
+        self.user.save()
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            self._authenticate()
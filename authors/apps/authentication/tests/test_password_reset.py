@@ -1,13 +1,18 @@
 from datetime import datetime, timedelta
+from io import StringIO
 import jwt
 from django.conf import settings
+from django.core.management import call_command
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework import status
 from rest_framework.generics import get_object_or_404
 from rest_framework.test import APITestCase
 from authors.apps.authentication.serializers import PasswordResetTokenSerializer
 from authors.apps.core.utils import TokenHandler
-from authors.apps.authentication.models import User, PasswordResetToken
+from authors.apps.authentication.models import (User, PasswordResetToken,
+                                                RefreshToken)
+from authors.apps.authentication.tokens import digest
 
 
 class PasswordResetTestCase(APITestCase):
@@ -389,3 +394,51 @@ class PasswordResetTestCase(APITestCase):
         response = self.client.put(self.url, password_data,
                                    format='json')
         self.assertEqual(response.data, password_data_response)
+
+
+class PasswordResetTokenStorageTestCase(APITestCase):
+    """Tests for how password reset tokens are stored and purged."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='Mary', email='mary@gmail.com', password='Mary1234')
+
+    def issue(self, email):
+        token = TokenHandler().create_verification_token(
+            {'email': email, 'callback_url': 'https://medium.com'})
+        PasswordResetToken.objects.issue(self.user, digest(token))
+        return token
+
+    def test_tokens_are_stored_as_digests(self):
+        token = self.issue('mary@gmail.com')
+        stored = PasswordResetToken.objects.get(user=self.user)
+        self.assertEqual(stored.digest, digest(token))
+        self.assertGreater(stored.expires_at, timezone.now())
+
+    def test_new_tokens_invalidate_previous_ones(self):
+        self.issue('old@gmail.com')
+        self.issue('mary@gmail.com')
+        self.assertEqual(list(PasswordResetToken.objects.filter(
+            user=self.user).order_by('pk').values_list(
+                'is_valid', flat=True)), [False, True])
+
+    def test_expired_tokens_are_refused(self):
+        token = self.issue('mary@gmail.com')
+        PasswordResetToken.objects.update(expires_at=timezone.now())
+        response = self.client.put(reverse('authentication:password-reset'), {
+            'user_password': {'password': 'mary1234',
+                              'confirm_password': 'mary1234',
+                              'token': token}}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_purge_expired_tokens_command(self):
+        self.issue('old@gmail.com')
+        self.issue('mary@gmail.com')
+        PasswordResetToken.objects.filter(is_valid=False).update(
+            expires_at=timezone.now() - timedelta(seconds=1))
+        RefreshToken.objects.create(
+            user=self.user, digest=digest('expired'),
+            expires_at=timezone.now() - timedelta(seconds=1))
+        call_command('purge_expired_tokens', batch_size=1, stdout=StringIO())
+        self.assertEqual(PasswordResetToken.objects.get().is_valid, True)
+        self.assertFalse(RefreshToken.objects.exists())
@@ -1,3 +1,6 @@
+import jwt
+
+from django.conf import settings
 from django.test import TestCase
 
 from rest_framework.serializers import ValidationError
@@ -75,12 +78,14 @@ class LoginSerializerTests(TestCase):
         serializer = LoginSerializer(data=login_data)
 
         returned_user_data = serializer.validate(login_data)
+        token = returned_user_data.pop('token')
         self.assertEqual({
             "email": "bob@email.com",
-            "username": "bob",
-            'token': user.token},
+            "username": "bob"},
             returned_user_data
         )
+        self.assertEqual(
+            jwt.decode(token, settings.SECRET_KEY)['id'], user.pk)
 
     def test_unverified_user_cannot_log_in(self):
         """Users who have not verified their accounts should not be able to log in"""
@@ -1,7 +1,10 @@
 from django.urls import reverse
+from django.core import mail
 from rest_framework import status
 from rest_framework.test import APITestCase, APIClient
 
+from authors.apps.core.models import QueuedEmail
+
 
 class RegistrationTestCase(APITestCase):
     url = reverse('authentication:register')
@@ -24,6 +27,21 @@ class RegistrationTestCase(APITestCase):
         self.assertEqual(response.data, signup_data_response)
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
 
+    def test_verification_email_is_queued(self):
+        """The verification email is left to the outbox worker."""
+        signup_data = {
+            "user": {
+                "username": "Mary",
+                "email": "yafyasufyi@desoz.com",
+                "password": "Mary1234",
+                "callback_url": "http://www.example.com"
+            }
+        }
+        self.client.post(self.url, signup_data, format='json')
+        queued = QueuedEmail.objects.get()
+        self.assertEqual(queued.to, "yafyasufyi@desoz.com")
+        self.assertEqual(len(mail.outbox), 0)
+
     def test_blank_username(self):
         """Test for user registration with a blank username."""
         blank_username_data = {
@@ -1,6 +1,9 @@
 import json
+from unittest import mock
 
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.conf import settings
 
@@ -47,6 +50,26 @@ class LoginViewTest(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertIn('token', response.data)
 
+    def test_login_loads_the_user_once_and_signs_once(self):
+        """A login costs one user query, one refresh token insert and one
+        token signature"""
+        client = APIClient()
+        user = User.objects.create_user(
+            username='user3', email='user3@mail.com', password='password')
+        user.is_verified = True
+        user.save()
+        with mock.patch('authors.apps.authentication.models.jwt.encode',
+                        wraps=jwt.encode) as encode:
+            with CaptureQueriesContext(connection) as context:
+                response = client.post(reverse('authentication:login'), {
+                    'user': {'email': 'user3@mail.com',
+                             'password': 'password'}}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(context.captured_queries), 2)
+        self.assertEqual(encode.call_count, 1)
+        self.assertTrue(response.data['refresh_token'])
+        self.assertEqual(response.data['profile']['username'], 'user3')
+
 
 class UserRetrieveUpdateAPITest(TestCase):
     """This class defines tests for the UserRetrieveUpdateAPIView"""
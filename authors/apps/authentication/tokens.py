@@ -0,0 +1,119 @@
+"""
+Access and refresh tokens.
+
+Logging in issues a pair of tokens. The access token is a JWT that lives
+for `JWT_ACCESS_TOKEN_LIFETIME` seconds and is checked from its signature
+alone. The refresh token is a random string, valid for
+`JWT_REFRESH_TOKEN_LIFETIME` seconds, that the client trades for a new
+pair once its access token expires. Only the SHA-256 digest of a refresh
+token is stored, and it is deleted when traded, so each one works once.
+
+Logging out revokes the access token by its `jti`. Revocations are read
+into an in-memory denylist in each process, which every
+`JWT_DENYLIST_SYNC_INTERVAL` seconds fetches the rows added since its
+last sync and forgets the tokens that have expired anyway. Checking a
+token never costs a query of its own.
+"""
+import secrets
+import threading
+import time
+from datetime import datetime, timedelta
+from hashlib import sha256
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import exceptions
+
+from .models import RefreshToken, RevokedAccessToken
+
+# Rows revoked this long before the last sync are read again, in case
+# their transaction committed after it.
+SYNC_OVERLAP = timedelta(seconds=60)
+
+
+def digest(refresh_token):
+    """Return the stored digest of `refresh_token`."""
+    return sha256(refresh_token.encode('utf-8')).hexdigest()
+
+
+def issue_tokens(user, token=None):
+    """Return a new refresh token for `user`, along with `token`, an
+    access token already issued to them, or a new one."""
+    refresh_token = secrets.token_urlsafe(32)
+    RefreshToken.objects.create(
+        user=user, digest=digest(refresh_token),
+        expires_at=timezone.now() + timedelta(
+            seconds=settings.JWT_REFRESH_TOKEN_LIFETIME))
+    return {'token': token or user.token, 'refresh_token': refresh_token}
+
+
+def refresh_tokens(refresh_token):
+    """Trade `refresh_token` for a new pair of tokens. Return the user and
+    the tokens, or raise `AuthenticationFailed`."""
+    stored = RefreshToken.objects.select_related('user').filter(
+        digest=digest(refresh_token), expires_at__gt=timezone.now()).first()
+    if stored is None or not stored.user.is_active:
+        raise exceptions.AuthenticationFailed(
+            'Invalid or expired refresh token.')
+    with transaction.atomic():
+        # Of concurrent trades of the same token, only one deletes it.
+        deleted, _ = RefreshToken.objects.filter(pk=stored.pk).delete()
+        if not deleted:
+            raise exceptions.AuthenticationFailed(
+                'Invalid or expired refresh token.')
+        return stored.user, issue_tokens(stored.user)
+
+
+def revoke(payload, refresh_token=None):
+    """Revoke the access token with the decoded `payload` and, when given,
+    `refresh_token`, if it belongs to the same user."""
+    expires_at = datetime.fromtimestamp(payload['exp'], tz=timezone.utc)
+    RevokedAccessToken.objects.get_or_create(
+        jti=payload['jti'], defaults={'expires_at': expires_at})
+    denylist.add(payload['jti'], expires_at)
+    if refresh_token:
+        RefreshToken.objects.filter(
+            digest=digest(refresh_token), user_id=payload['id']).delete()
+
+
+class AccessTokenDenylist:
+    """The ids of the revoked access tokens that haven't expired yet,
+    synced from `RevokedAccessToken` a few new rows at a time."""
+
+    def __init__(self):
+        self._expiries = {}
+        self._synced_at = None
+        self._synced_until = None
+        self._lock = threading.Lock()
+
+    def __contains__(self, jti):
+        self.sync()
+        return jti in self._expiries
+
+    def add(self, jti, expires_at):
+        self._expiries[jti] = expires_at
+
+    def sync(self, force=False):
+        """Read the revocations added since the last sync, unless that was
+        less than `JWT_DENYLIST_SYNC_INTERVAL` seconds ago."""
+        started = time.monotonic()
+        if not force and self._synced_at is not None:
+            elapsed = started - self._synced_at
+            if elapsed < settings.JWT_DENYLIST_SYNC_INTERVAL:
+                return
+        with self._lock:
+            now = timezone.now()
+            revoked = RevokedAccessToken.objects.filter(expires_at__gt=now)
+            if self._synced_until is not None:
+                revoked = revoked.filter(
+                    revoked_at__gte=self._synced_until - SYNC_OVERLAP)
+            self._expiries.update(revoked.values_list('jti', 'expires_at'))
+            self._expiries = {
+                jti: expires_at for jti, expires_at in self._expiries.items()
+                if expires_at > now}
+            self._synced_until = now
+            self._synced_at = started
+
+
+denylist = AccessTokenDenylist()
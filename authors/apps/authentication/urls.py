@@ -3,7 +3,7 @@ from django.urls import path
 from .views import (LoginAPIView, RegistrationAPIView,
                     UserRetrieveUpdateAPIView, SocialAuthenticationView,
                     EmailVerificationView, CreateEmailVerificationTokenAPIView,
-                    PasswordResetView)
+                    PasswordResetView, RefreshTokenAPIView, LogoutAPIView)
 from ..articles.views import GetAllArticlesForCurrentUser
 from authors.apps.articles.views import AllUserArticleReports
 
@@ -15,6 +15,9 @@ urlpatterns = [
     path('', UserRetrieveUpdateAPIView.as_view(), name='get users'),
     path('register/', RegistrationAPIView.as_view(), name='register'),
     path('login/', LoginAPIView.as_view(), name='login'),
+    path('login/refresh/', RefreshTokenAPIView.as_view(),
+         name='refresh-token'),
+    path('logout/', LogoutAPIView.as_view(), name='logout'),
     path('oauth/', SocialAuthenticationView.as_view(),
          name='social_login'),
     path('activate/<str:token>',
@@ -0,0 +1,95 @@
+"""
+Cache of the user state JWT authentication checks on every request.
+
+When `JWT_USER_CACHE` names a cache alias, the id, username, `is_active`
+and `is_verified` flags and profile id of each authenticated user are kept
+there for `JWT_USER_CACHE_TIMEOUT` seconds, and in a dict in each process
+for `JWT_USER_LOCAL_CACHE_TIMEOUT` seconds in front of it. Authentication
+builds the user from that state instead of querying for it. Every other
+field is deferred, and reading one loads them all in a single query.
+
+Saving or deleting a user drops their state from the shared cache and
+from the dict of the process that did it, right away and again once the
+transaction commits. Other processes see the change within the local
+timeout. Changes made with `QuerySet.update()` are only seen once the
+state expires.
+"""
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import router, transaction
+
+STATE_KEY = 'jwt-user:{}'
+STATE_FIELDS = ('id', 'username', 'is_active', 'is_verified', 'profile__id')
+# Entries kept in each process before the dict is emptied.
+LOCAL_CACHE_SIZE = 10000
+
+_local_states = {}
+
+
+def enabled():
+    """Return whether authentication reads users from the cache."""
+    return bool(settings.JWT_USER_CACHE)
+
+
+def _cache():
+    return caches[settings.JWT_USER_CACHE]
+
+
+def get_state(user_id):
+    """Return the cached state of the user with `user_id`, loading it on
+    a miss, or None when there is no such user."""
+    now = time.monotonic()
+    local = _local_states.get(user_id)
+    if local is not None and local[0] > now:
+        return local[1]
+
+    key = STATE_KEY.format(user_id)
+    state = _cache().get(key)
+    if state is None:
+        state = get_user_model().objects.filter(pk=user_id).values(
+            *STATE_FIELDS).first()
+        if state is None:
+            return None
+        _cache().set(key, state, settings.JWT_USER_CACHE_TIMEOUT)
+
+    if settings.JWT_USER_LOCAL_CACHE_TIMEOUT:
+        if len(_local_states) >= LOCAL_CACHE_SIZE:
+            _local_states.clear()
+        _local_states[user_id] = (
+            now + settings.JWT_USER_LOCAL_CACHE_TIMEOUT, state)
+    return state
+
+
+def build_user(state):
+    """Return a user holding only the fields in `state`, with its profile
+    attached, holding only its id, when it has one."""
+    user_model = get_user_model()
+    db = router.db_for_read(user_model)
+    loaded = [field.attname for field in user_model._meta.concrete_fields
+              if field.attname in state]
+    user = user_model.from_db(db, loaded, [state[name] for name in loaded])
+
+    if state['profile__id'] is not None:
+        related = user_model.profile.related
+        profile = related.related_model.from_db(
+            db, ['id', 'user_id'], [state['profile__id'], user.pk])
+        related.set_cached_value(user, profile)
+        related.field.set_cached_value(profile, user)
+    return user
+
+
+def invalidate(user_id):
+    """Drop the cached state of the user with `user_id`, now and once the
+    current transaction commits."""
+    if not enabled():
+        return
+
+    def drop():
+        _local_states.pop(user_id, None)
+        _cache().delete(STATE_KEY.format(user_id))
+
+    drop()
+    transaction.on_commit(drop)
@@ -1,3 +1,5 @@
+import jwt
+
 from drf_yasg.utils import swagger_auto_schema
 
 from social_django.utils import load_strategy, load_backend
@@ -5,8 +7,9 @@ from social_core.exceptions import MissingBackend
 from social_core.backends.oauth import BaseOAuth1
 from django.http import HttpResponseRedirect
 from django.conf import settings
-from django.core import mail
+from django.db import transaction
 from django.template.loader import render_to_string
+from django.utils import timezone
 from django.utils.html import strip_tags
 from rest_framework import status
 from rest_framework.generics import RetrieveUpdateAPIView,\
@@ -19,10 +22,12 @@ from .serializers import (LoginSerializer, RegistrationSerializer,
                           UserSerializer, SocialAuthenticationSerializer,
                           CreateEmailVerificationSerializer,
                           PasswordChangeSerializer,
-                          PasswordResetSerializer, PasswordResetTokenSerializer)
+                          PasswordResetSerializer, PasswordResetTokenSerializer,
+                          RefreshTokenSerializer)
 from .utils import validate_image
+from . import tokens
+from authors.apps.core.outbox import queue_email
 from authors.apps.core.utils import TokenHandler
-from threading import Thread
 from .models import User, PasswordResetToken
 
 
@@ -60,21 +65,14 @@ class RegistrationAPIView(APIView):
         # https://stackoverflow.com/questions/3005080/how-to-send-html-email-with-django-with-dynamic-content-in-it
         html_message = render_to_string(template_name, context)
         text_message = strip_tags(html_message)
-        thread = Thread(
-            target=mail.send_mail, args=[
-                'Please verify your email',
-                text_message,
-                settings.FROM_EMAIL,
-                [user_email, ],
-                html_message]
-        )
-        thread.setDaemon(True)
-        thread.start()
 
         message = {
             'message': 'Successfully created your account. Please proceed to your email ' + # noqa
                    user_email + ' to verify your account.'}
-        serializer.save()
+        with transaction.atomic():
+            serializer.save()
+            queue_email('Please verify your email', [user_email],
+                        body=text_message, html_body=html_message)
         return Response(message, status=status.HTTP_201_CREATED)
 
 
@@ -100,13 +98,58 @@ class LoginAPIView(APIView):
         # handles everything we need.
         serializer = self.serializer_class(data=user)
         serializer.is_valid(raise_exception=True)
-        username = serializer.data.get('username')
-        instance = User.objects.get(username=username)
-        user_serializer = UserSerializer(
-            instance, context={'current_user': request.user})
+        # The user authenticated with its profile joined, and the token
+        # issued for it, are reused as they are.
+        context = tokens.issue_tokens(
+            serializer.user, serializer.validated_data['token'])
+        context['current_user'] = request.user
+        user_serializer = UserSerializer(serializer.user, context=context)
+        return Response(user_serializer.data, status=status.HTTP_200_OK)
+
+
+class RefreshTokenAPIView(APIView):
+    """
+    post:
+        Trade a refresh token for a new access token and refresh token.
+        Each refresh token can only be used once.
+    """
+    permission_classes = (AllowAny,)
+    renderer_classes = (UserJSONRenderer,)
+    serializer_class = RefreshTokenSerializer
+
+    @swagger_auto_schema(query_serializer=RefreshTokenSerializer,
+                         responses={200: UserSerializer()})
+    def post(self, request):
+        serializer = self.serializer_class(data=request.data.get('user', {}))
+        serializer.is_valid(raise_exception=True)
+        user, context = tokens.refresh_tokens(
+            serializer.validated_data['refresh_token'])
+        context['current_user'] = user
+        user_serializer = UserSerializer(user, context=context)
         return Response(user_serializer.data, status=status.HTTP_200_OK)
 
 
+class LogoutAPIView(APIView):
+    """
+    post:
+        Revoke the access token of the request and, when it is sent
+        along, the refresh token issued with it.
+    """
+    permission_classes = (IsAuthenticated,)
+    renderer_classes = (UserJSONRenderer,)
+    serializer_class = RefreshTokenSerializer
+
+    def post(self, request):
+        serializer = self.serializer_class(
+            data=request.data.get('user', {}), partial=True)
+        serializer.is_valid(raise_exception=True)
+        payload = jwt.decode(request.auth, settings.SECRET_KEY)
+        tokens.revoke(
+            payload, serializer.validated_data.get('refresh_token'))
+        return Response({'message': 'You have been logged out.'},
+                        status=status.HTTP_200_OK)
+
+
 class UserRetrieveUpdateAPIView(RetrieveUpdateAPIView):
     """
     get:
@@ -221,8 +264,9 @@ class SocialAuthenticationView(CreateAPIView):
 
         user.is_verified = True
         user.save()
-        serializer = UserSerializer(
-            user, context={'current_user': request.user})
+        context = tokens.issue_tokens(user)
+        context['current_user'] = request.user
+        serializer = UserSerializer(user, context=context)
         serializer.instance = user
         return Response(serializer.data, status=status.HTTP_200_OK)
 
@@ -287,16 +331,8 @@ class CreateEmailVerificationTokenAPIView(APIView):
                    'token': token, 'domain': domain}
         html_message = render_to_string(template_name, context)
         text_message = strip_tags(html_message)
-        thread = Thread(
-            target=mail.send_mail, args=[
-                'Please verify your email',
-                text_message,
-                settings.FROM_EMAIL,
-                [user_email, ],
-                html_message]
-        )
-        thread.setDaemon(True)
-        thread.start()
+        queue_email('Please verify your email', [user_email],
+                    body=text_message, html_body=html_message)
 
         message = {'message': 'New verification token created. Please proceed to your email ' + # noqa
                    user_email + ' to verify your account.'}
@@ -330,9 +366,10 @@ class PasswordResetView(APIView):
             }
             serializer = PasswordResetTokenSerializer(data=token_data)
             serializer.is_valid(raise_exception=True)
-            serializer.save()
-            TokenHandler().send_password_reset_link(user_email,
-                                                    token, callback_url)
+            with transaction.atomic():
+                serializer.save()
+                TokenHandler().send_password_reset_link(user_email,
+                                                        token, callback_url)
             return Response({"message": message},
                             status=status.HTTP_200_OK)
         except User.DoesNotExist:
@@ -351,8 +388,11 @@ class PasswordResetView(APIView):
             serializer = PasswordChangeSerializer(data=data)
             serializer.is_valid(raise_exception=True)
             token = data['token']
-            user = PasswordResetToken.objects.get(token=token)
-            is_valid = user.is_valid
+            user = PasswordResetToken.objects.filter(
+                digest=tokens.digest(token)).latest('pk')
+            # Tokens replaced by a newer one or past their expiry are
+            # refused like used ones.
+            is_valid = user.is_valid and user.expires_at > timezone.now()
             if is_valid:
                 credentials = TokenHandler().validate_token(token)
                 password = data['password']
@@ -369,7 +409,7 @@ class PasswordResetView(APIView):
                 serializer.set_password(password)
                 serializer.save()
                 user.is_valid = False
-                user.save()
+                user.save(update_fields=['is_valid'])
                 return Response(
                     {'message': 'Your password has been changed.'},
                     status=status.HTTP_202_ACCEPTED)
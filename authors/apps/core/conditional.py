@@ -0,0 +1,66 @@
+"""
+Conditional GET support.
+
+A view decorated with `conditional_get` describes the current state of
+the resource it serves through `get_resource_state()`: a dict of the
+values its payload depends on, read with one lightweight query such as
+`values('updated_at')`. That runs before any serialization. The ETag is a
+hash of those values and of the viewer, since payloads carry viewer
+specific fields like `following`. When the state holds nothing but
+timestamps, Last-Modified is the newest of them; counters, flags and
+versions can change without moving any timestamp, so states holding them
+are validated by the ETag alone. Clients that send back a matching
+`If-None-Match`, or a recent enough `If-Modified-Since` where there is a
+Last-Modified, get an empty `304 Not Modified`.
+"""
+from calendar import timegm
+from datetime import datetime
+from functools import wraps
+from hashlib import md5
+
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+
+def resource_validators(request, state):
+    """Return the ETag and Last-Modified timestamp of the resource in
+    `state`, as served to the user of `request`. There is no Last-Modified
+    unless every value in `state` is a timestamp, or None."""
+    viewer = getattr(request.user, 'pk', None)
+    etag = md5(repr((sorted(state.items()), viewer)).encode(
+        'utf-8')).hexdigest()
+    timestamps = [value for value in state.values()
+                  if isinstance(value, datetime)]
+    last_modified = None
+    only_timestamps = all(
+        value is None or isinstance(value, datetime)
+        for value in state.values())
+    if timestamps and only_timestamps:
+        last_modified = timegm(max(timestamps).utctimetuple())
+    return quote_etag(etag), last_modified
+
+
+def conditional_get(get):
+    """Answer the decorated `get` with ETag and Last-Modified headers, or
+    with `304 Not Modified` without calling it when the client's copy is
+    current. Nothing changes when `get_resource_state()` returns None,
+    which it does for missing resources."""
+    @wraps(get)
+    def inner(view, request, *args, **kwargs):
+        state = view.get_resource_state(request, *args, **kwargs)
+        if state is None:
+            return get(view, request, *args, **kwargs)
+
+        etag, last_modified = resource_validators(request, state)
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = get(view, request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+            response['ETag'] = etag
+            if last_modified is not None:
+                response['Last-Modified'] = http_date(last_modified)
+        patch_vary_headers(response, ('Authorization',))
+        return response
+    return inner
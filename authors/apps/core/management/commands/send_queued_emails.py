@@ -0,0 +1,62 @@
+import time
+
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand
+
+from ...outbox import send_batch
+
+
+class Command(BaseCommand):
+    """Send the emails queued in the outbox.
+
+    Batches are sent over one connection, which stays open while there is
+    mail to send and is closed whenever the outbox runs dry. Unless told
+    to stop once the outbox is empty, the command keeps polling it.
+    """
+    help = 'Send queued emails, polling the outbox for new ones.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=100,
+            help='Number of emails sent per batch.')
+        parser.add_argument(
+            '--interval', type=float, default=5,
+            help='Seconds to wait before checking an empty outbox again.')
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Stop once the outbox has no due emails left.')
+
+    def handle(self, *args, **options):
+        connection = get_connection()
+        total_sent = 0
+        total_failed = 0
+        try:
+            while True:
+                try:
+                    sent, failed = send_batch(
+                        connection, options['batch_size'])
+                except OSError as error:
+                    # The mail server is unreachable, wait and retry.
+                    if options['once']:
+                        raise
+                    self.stderr.write(f'Could not send emails: {error!r}')
+                    connection.close()
+                    time.sleep(options['interval'])
+                    continue
+                total_sent += sent
+                total_failed += failed
+                if failed:
+                    # Start the next batch on a fresh connection.
+                    connection.close()
+                if sent or failed:
+                    continue
+                connection.close()
+                if options['once']:
+                    break
+                time.sleep(options['interval'])
+        finally:
+            connection.close()
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Sent {total_sent} emails, '
+                               f'{total_failed} failed.'))
@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 from django.utils.translation import ugettext_lazy as _
 
 
@@ -9,3 +10,40 @@ class TimeStampModel(models.Model):
 
     class Meta:
         abstract = True
+
+
+class LoadDeferredTogetherMixin:
+    """
+    Load every deferred field of an instance in one query the first time
+    any of them is read, rather than one query per field read.
+    """
+
+    def refresh_from_db(self, using=None, fields=None):
+        deferred = self.get_deferred_fields()
+        if fields is not None and deferred.issuperset(fields):
+            fields = deferred
+        super().refresh_from_db(using=using, fields=fields)
+
+
+class QueuedEmail(models.Model):
+    """
+    An email waiting in the outbox, see `authors.apps.core.outbox`. Sent
+    emails are deleted, ones that keep failing are marked `failed`.
+    """
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    html_body = models.TextField(blank=True, default='')
+    from_email = models.CharField(max_length=255)
+    # Recipient addresses, one per line.
+    to = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    send_after = models.DateTimeField(default=timezone.now)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True, default='')
+    failed = models.BooleanField(default=False)
+
+    class Meta:
+        index_together = (('failed', 'send_after'),)
+
+    def __str__(self):
+        return self.subject
@@ -0,0 +1,126 @@
+"""
+Email outbox.
+
+Views queue emails with `queue_email()`, which writes a `QueuedEmail` row
+in the request's transaction: an email is never sent for work that rolled
+back, and once committed it survives the worker process going away. The
+`send_queued_emails` command drains the outbox with `send_batch()`, a
+batch at a time over one SMTP connection it keeps open while there is
+mail to send.
+
+A failed email is retried after `EMAIL_OUTBOX_RETRY_DELAY` seconds,
+doubling after each further failure, and is marked `failed` after
+`EMAIL_OUTBOX_MAX_ATTEMPTS` attempts. Losing the connection to the mail
+server isn't a failure of the emails left to send, they are just sent
+on the next try.
+"""
+import smtplib
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives
+from django.db import transaction
+from django.utils import timezone
+from django.utils.html import strip_tags
+
+from .models import QueuedEmail
+
+# How long claimed emails are kept from other workers while being sent.
+CLAIM_TIMEOUT = timedelta(minutes=10)
+# Errors of the connection rather than of the email being sent. Other
+# `SMTPException`s, also `OSError`s, are the server refusing one email.
+CONNECTION_ERRORS = (smtplib.SMTPServerDisconnected, ConnectionError,
+                     TimeoutError)
+
+
+def queue_email(subject, to, body='', html_body='', from_email=None):
+    """Queue an email to the addresses in `to`. Without a plain text
+    `body`, one is made from `html_body`."""
+    return QueuedEmail.objects.create(
+        subject=subject,
+        body=body or strip_tags(html_body),
+        html_body=html_body,
+        from_email=from_email or settings.FROM_EMAIL,
+        to='\n'.join(to))
+
+
+def build_message(email, connection):
+    """Return the message to send for the queued `email`."""
+    message = EmailMultiAlternatives(
+        email.subject, email.body, email.from_email, email.to.splitlines(),
+        connection=connection)
+    if email.html_body:
+        message.attach_alternative(email.html_body, 'text/html')
+    return message
+
+
+def retry_delay(attempts):
+    """Return how long to wait before the next try after `attempts`
+    failed ones."""
+    return timedelta(
+        seconds=settings.EMAIL_OUTBOX_RETRY_DELAY * 2 ** (attempts - 1))
+
+
+def claim_batch(batch_size):
+    """Claim up to `batch_size` due emails and return them.
+
+    The emails are locked only while their `send_after` is moved
+    `CLAIM_TIMEOUT` ahead, which keeps other workers off them while they
+    are sent outside any transaction. Should the worker die, they are
+    due again once the claim runs out.
+    """
+    with transaction.atomic():
+        due = QueuedEmail.objects.select_for_update(skip_locked=True).filter(
+            failed=False, send_after__lte=timezone.now()).order_by(
+                'send_after', 'pk')
+        batch = list(due[:batch_size])
+        QueuedEmail.objects.filter(pk__in=[email.pk for email in batch]).update(
+            send_after=timezone.now() + CLAIM_TIMEOUT)
+    return batch
+
+
+def send_batch(connection, batch_size):
+    """Send up to `batch_size` due emails over `connection`. Return the
+    numbers of emails sent and failed.
+
+    An email the server refuses is retried later. When the connection
+    itself fails, the `OSError` is raised once the emails not yet sent
+    are released, without counting an attempt against them.
+    """
+    batch = claim_batch(batch_size)
+    if not batch:
+        return 0, 0
+    sent = []
+    failed = 0
+    unsent = [email.pk for email in batch]
+    try:
+        # Opened here, as backends close the connections they open for a
+        # send once it is done.
+        connection.open()
+        for email in batch:
+            try:
+                build_message(email, connection).send()
+            except CONNECTION_ERRORS:
+                raise
+            except Exception as error:
+                failed += 1
+                record_failure(email, error)
+            else:
+                sent.append(email.pk)
+            unsent.remove(email.pk)
+    finally:
+        QueuedEmail.objects.filter(pk__in=sent).delete()
+        QueuedEmail.objects.filter(pk__in=unsent).update(
+            send_after=timezone.now())
+    return len(sent), failed
+
+
+def record_failure(email, error):
+    """Count a failed attempt to send `email`, and give up on it after
+    `EMAIL_OUTBOX_MAX_ATTEMPTS`."""
+    email.attempts += 1
+    email.last_error = repr(error)
+    email.failed = email.attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS
+    email.send_after = timezone.now() + retry_delay(email.attempts)
+    email.save(update_fields=[
+        'attempts', 'last_error', 'failed', 'send_after'])
@@ -0,0 +1,120 @@
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import (Cursor, CursorPagination,
+                                       _reverse_ordering)
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Cursor pagination over a unique, multi-column ordering such as
+    `('-created_at', '-id')`.
+
+    DRF's `CursorPagination` keys on the first ordering field only and
+    falls back to an offset for ties. Here the cursor carries a value for
+    every ordering field, so each page is a single range query with no
+    `COUNT(*)` and no `OFFSET`, however deep the client pages.
+    """
+    ordering = ('-created_at', '-id')
+    page_size_query_param = 'limit'
+    max_page_size = 100
+    position_separator = '|'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            reverse, current_position = False, None
+        else:
+            reverse, current_position = (self.cursor.reverse,
+                                         self.cursor.position)
+
+        if reverse:
+            ordering = _reverse_ordering(self.ordering)
+        else:
+            ordering = self.ordering
+        queryset = queryset.order_by(*ordering)
+
+        if current_position is not None:
+            queryset = queryset.filter(
+                self._after_position(current_position, ordering))
+
+        # Fetch one extra row to find out whether another page follows.
+        try:
+            results = list(queryset[:self.page_size + 1])
+        except (ValidationError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        self.page = results[:self.page_size]
+
+        if len(results) > len(self.page):
+            has_following_position = True
+            following_position = self._get_position_from_instance(
+                results[-1], self.ordering)
+        else:
+            has_following_position = False
+            following_position = None
+
+        if reverse:
+            self.page = list(reversed(self.page))
+            self.has_next = current_position is not None
+            self.has_previous = has_following_position
+            if self.has_next:
+                self.next_position = current_position
+            if self.has_previous:
+                self.previous_position = following_position
+        else:
+            self.has_next = has_following_position
+            self.has_previous = current_position is not None
+            if self.has_next:
+                self.next_position = following_position
+            if self.has_previous:
+                self.previous_position = current_position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+
+        return self.page
+
+    def get_url_after(self, url, instance):
+        """Return `url` with a cursor to the rows that sort after
+        `instance`, for linking to the rest of a listing that was not
+        paginated by this paginator."""
+        self.base_url = url
+        position = self._get_position_from_instance(instance, self.ordering)
+        return self.encode_cursor(
+            Cursor(offset=0, reverse=False, position=position))
+
+    def _after_position(self, position, ordering):
+        """Return a filter for the rows that sort strictly after
+        `position` under `ordering`."""
+        values = position.split(self.position_separator)
+        if len(values) != len(ordering):
+            raise NotFound(self.invalid_cursor_message)
+
+        condition = Q()
+        equal = Q()
+        for field, value in zip(ordering, values):
+            name = field.lstrip('-')
+            lookup = '__lt' if field.startswith('-') else '__gt'
+            condition |= equal & Q(**{name + lookup: value})
+            equal &= Q(**{name: value})
+        return condition
+
+    def _get_position_from_instance(self, instance, ordering):
+        values = []
+        for field in ordering:
+            name = field.lstrip('-')
+            if isinstance(instance, dict):
+                attr = instance[name]
+            else:
+                attr = getattr(instance, name)
+            if hasattr(attr, 'isoformat'):
+                attr = attr.isoformat()
+            values.append(str(attr))
+        return self.position_separator.join(values)
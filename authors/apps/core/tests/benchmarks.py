@@ -0,0 +1,66 @@
+"""
+Benchmarks for the core app.
+
+They are not collected by the default test run. Run them explicitly with:
+
+    python manage.py test authors.apps.core.tests.benchmarks \
+        --settings=authors.settings.test
+"""
+import shutil
+import tempfile
+
+from django.core import mail
+from django.test import TestCase
+
+from ..models import QueuedEmail
+from ..outbox import queue_email, send_batch
+from .utils import timed
+
+
+class OutboxBenchmark(TestCase):
+    """Sending emails one connection each, as the request threads did,
+    versus draining the outbox in batches over one connection."""
+    emails = 1000
+    batch_size = 100
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.backends = {
+            'locmem': {},
+            'filebased': {'file_path': self.directory},
+        }
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def _backend(self, name):
+        return mail.get_connection(
+            f'django.core.mail.backends.{name}.EmailBackend',
+            **self.backends[name])
+
+    def _send_each(self, name):
+        for index in range(self.emails):
+            mail.send_mail('Please verify your email', 'body',
+                           'from@mail.com', [f'user{index}@mail.com'],
+                           html_message='<p>body</p>',
+                           connection=self._backend(name))
+
+    def _drain_outbox(self, name):
+        for index in range(self.emails):
+            queue_email('Please verify your email', [f'user{index}@mail.com'],
+                        body='body', html_body='<p>body</p>',
+                        from_email='from@mail.com')
+        connection = self._backend(name)
+        while send_batch(connection, self.batch_size) != (0, 0):
+            pass
+        connection.close()
+
+    def test_email_throughput(self):
+        print()
+        for name in self.backends:
+            each = timed(lambda: self._send_each(name))
+            outbox = timed(lambda: self._drain_outbox(name))
+            self.assertFalse(QueuedEmail.objects.exists())
+            print(f'{name}: {self.emails / each:.0f} emails/s sent one by '
+                  f'one, {self.emails / outbox:.0f} emails/s queued and '
+                  f'sent from the outbox')
@@ -0,0 +1,31 @@
+from datetime import datetime, timezone
+
+from django.contrib.auth.models import AnonymousUser
+from django.test import SimpleTestCase
+from rest_framework.test import APIRequestFactory
+
+from authors.apps.core.conditional import resource_validators
+
+
+class ResourceValidatorsTest(SimpleTestCase):
+    """Test the validators worked out from a resource state"""
+
+    def setUp(self):
+        self.request = APIRequestFactory().get('/')
+        self.request.user = AnonymousUser()
+        self.older = datetime(2019, 3, 1, tzinfo=timezone.utc)
+        self.newer = datetime(2019, 3, 2, tzinfo=timezone.utc)
+
+    def test_timestamps_give_the_newest_as_last_modified(self):
+        _, last_modified = resource_validators(
+            self.request, {'updated_at': self.older,
+                           'author__updated_at': self.newer,
+                           'replies_updated_at': None})
+        self.assertEqual(last_modified, self.newer.timestamp())
+
+    def test_other_values_leave_only_the_etag(self):
+        etag, last_modified = resource_validators(
+            self.request, {'updated_at': self.newer, 'count': 2})
+        self.assertIsNone(last_modified)
+        self.assertNotEqual(etag, resource_validators(
+            self.request, {'updated_at': self.newer, 'count': 1})[0])
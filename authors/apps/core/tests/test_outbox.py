@@ -0,0 +1,81 @@
+import smtplib
+
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from authors.apps.core.models import QueuedEmail
+from authors.apps.core.outbox import claim_batch, queue_email, send_batch
+
+
+class RefusingEmailBackend(EmailBackend):
+    """Locmem backend whose server refuses every email."""
+
+    def send_messages(self, messages):
+        raise smtplib.SMTPRecipientsRefused({'one@mail.com': (
+            550, b'mailbox unavailable')})
+
+
+class DisconnectingEmailBackend(EmailBackend):
+    """Locmem backend whose connection drops after the first email."""
+
+    def send_messages(self, messages):
+        if mail.outbox:
+            raise smtplib.SMTPServerDisconnected('connection closed')
+        return super().send_messages(messages)
+
+
+class OutboxTest(TestCase):
+    """Queued emails are only sent by the outbox worker."""
+
+    def test_queued_emails_are_sent_by_the_worker(self):
+        queue_email('Hello', ['one@mail.com', 'two@mail.com'],
+                    html_body='<p>Hi there</p>')
+        self.assertEqual(len(mail.outbox), 0)
+
+        call_command('send_queued_emails', once=True)
+        self.assertEqual(len(mail.outbox), 1)
+        message = mail.outbox[0]
+        self.assertEqual(message.to, ['one@mail.com', 'two@mail.com'])
+        self.assertEqual(message.body, 'Hi there')
+        self.assertEqual(message.alternatives,
+                         [('<p>Hi there</p>', 'text/html')])
+        self.assertFalse(QueuedEmail.objects.exists())
+
+    @override_settings(EMAIL_OUTBOX_MAX_ATTEMPTS=2)
+    def test_failed_emails_are_retried_later_then_given_up(self):
+        email = queue_email('Hello', ['one@mail.com'], body='Hi')
+        connection = RefusingEmailBackend()
+
+        self.assertEqual(send_batch(connection, 10), (0, 1))
+        email.refresh_from_db()
+        self.assertEqual(email.attempts, 1)
+        self.assertFalse(email.failed)
+        self.assertIn('mailbox unavailable', email.last_error)
+        # Not due again until the retry delay has passed.
+        self.assertEqual(send_batch(connection, 10), (0, 0))
+
+        QueuedEmail.objects.update(send_after=email.created_at)
+        send_batch(connection, 10)
+        email.refresh_from_db()
+        self.assertTrue(email.failed)
+        QueuedEmail.objects.update(send_after=email.created_at)
+        self.assertEqual(send_batch(EmailBackend(), 10), (0, 0))
+
+    def test_a_dropped_connection_costs_no_attempts(self):
+        for index in range(3):
+            queue_email('Hello', [f'user{index}@mail.com'], body='Hi')
+        with self.assertRaises(smtplib.SMTPServerDisconnected):
+            send_batch(DisconnectingEmailBackend(), 10)
+        self.assertEqual(len(mail.outbox), 1)
+        unsent = QueuedEmail.objects.all()
+        self.assertEqual(len(unsent), 2)
+        self.assertEqual([email.attempts for email in unsent], [0, 0])
+        # Released to be sent on the next try.
+        self.assertEqual(send_batch(EmailBackend(), 10), (2, 0))
+
+    def test_claimed_emails_are_kept_from_other_workers(self):
+        queue_email('Hello', ['one@mail.com'], body='Hi')
+        self.assertEqual(len(claim_batch(10)), 1)
+        self.assertEqual(claim_batch(10), [])
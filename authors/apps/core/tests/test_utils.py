@@ -1,12 +1,16 @@
 from datetime import date, timedelta
+from unittest import mock
 
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.conf import settings
 from rest_framework import exceptions
 
 import jwt
+from cloudinary import CloudinaryImage
 
-from authors.apps.core.utils import TokenHandler
+from authors.apps.core.utils import (PROFILE_IMAGE_TRANSFORMATION,
+                                     TokenHandler, _build_cloudinary_url,
+                                     cloudinary_url)
 
 
 class TestTokenHandler(TestCase):
@@ -69,3 +73,39 @@ class TestTokenHandler(TestCase):
         res = TokenHandler().validate_token(token)
 
         self.assertEqual(res, 'Error. Could not decode token!')
+
+
+class TestCloudinaryUrl(TestCase):
+    """Test that built Cloudinary URLs are cached"""
+
+    def setUp(self):
+        _build_cloudinary_url.cache_clear()
+        self.addCleanup(_build_cloudinary_url.cache_clear)
+
+    def test_url_matches_cloudinary(self):
+        url = cloudinary_url('cats', **PROFILE_IMAGE_TRANSFORMATION)
+        self.assertEqual(url, CloudinaryImage('cats').build_url(
+            width=100, height=150, crop='fill'))
+
+    def test_url_is_built_once_per_image_and_transformation(self):
+        with mock.patch.object(CloudinaryImage, 'build_url',
+                               return_value='url') as build_url:
+            cloudinary_url('cats', width=100, crop='fill')
+            cloudinary_url('cats', crop='fill', width=100)
+            self.assertEqual(build_url.call_count, 1)
+            cloudinary_url('cats', width=200, crop='fill')
+            cloudinary_url('dogs', width=100, crop='fill')
+            self.assertEqual(build_url.call_count, 3)
+
+    @override_settings(
+        CLOUDINARY_URL_SHARED_CACHE='default',
+        CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    def test_shared_cache_is_used_across_processes(self):
+        with mock.patch.object(CloudinaryImage, 'build_url',
+                               return_value='url') as build_url:
+            cloudinary_url('cats', width=100)
+            # Simulate another worker with a cold in-process cache.
+            _build_cloudinary_url.cache_clear()
+            self.assertEqual(cloudinary_url('cats', width=100), 'url')
+            self.assertEqual(build_url.call_count, 1)
@@ -0,0 +1,13 @@
+"""Helpers shared by the test and benchmark modules of the apps."""
+import time
+
+
+def timed(function, repeat=1):
+    """Return the best wall clock time of `repeat` calls to `function`."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
@@ -1,16 +1,21 @@
 from datetime import datetime, timedelta
+from functools import lru_cache
+from hashlib import md5
 from urllib import parse
 
 import jwt
+from cloudinary import CloudinaryImage
 
 from django.conf import settings
+from django.core.cache import caches
 
 from rest_framework import exceptions
 
-from django.core.mail import EmailMessage
 from django.template.loader import render_to_string
 from django.urls import reverse
 
+from .outbox import queue_email
+
 
 class TokenHandler:
     """This class contains the methods for creating custom
@@ -60,15 +65,15 @@ class TokenHandler:
         return decoded_token
 
     def send_password_reset_link(self, to_email, token, callback_url):
+        """Queue the password reset email for `to_email`."""
         domain = settings.DOMAIN
         html_content = render_to_string('password_reset.html',
                                         {'callback_url': callback_url,
                                          'token': token, 'domain': domain})
         subject = 'Reset your Author\'s Haven Password'
         from_email = settings.EMAIL_HOST_USER
-        msg = EmailMessage(subject, html_content, from_email, [to_email])
-        msg.content_subtype = 'html'
-        msg.send()
+        queue_email(subject, [to_email], html_body=html_content,
+                    from_email=from_email)
 
 
 def share_link_generator(instance, request):
@@ -93,3 +98,37 @@ def share_link_generator(instance, request):
     links['google'] = 'https://plus.google.com/share?url=' + valid_article_link
 
     return links
+
+
+# The transformation used for every avatar we serve.
+PROFILE_IMAGE_TRANSFORMATION = {'width': 100, 'height': 150, 'crop': 'fill'}
+
+
+def cloudinary_url(public_id, **transformation):
+    """
+    Return the delivery URL of a Cloudinary image.
+
+    Building a URL is pure string work that depends only on the public id
+    and the transformation, so results are kept in a bounded in-process
+    LRU cache and, when `CLOUDINARY_URL_SHARED_CACHE` names a cache alias,
+    in that shared cache as well.
+    """
+    return _build_cloudinary_url(
+        str(public_id), tuple(sorted(transformation.items())))
+
+
+@lru_cache(maxsize=settings.CLOUDINARY_URL_CACHE_SIZE)
+def _build_cloudinary_url(public_id, transformation):
+    shared_cache = None
+    if settings.CLOUDINARY_URL_SHARED_CACHE:
+        shared_cache = caches[settings.CLOUDINARY_URL_SHARED_CACHE]
+        key = 'cloudinary-url:' + md5(
+            repr((public_id, transformation)).encode('utf-8')).hexdigest()
+        url = shared_cache.get(key)
+        if url is not None:
+            return url
+
+    url = CloudinaryImage(public_id).build_url(**dict(transformation))
+    if shared_cache is not None:
+        shared_cache.set(key, url, None)
+    return url
@@ -1,12 +1,13 @@
 from django.conf import settings
 from django.db import models
 from django.db.models.signals import post_save
-from authors.apps.core.models import TimeStampModel
+from authors.apps.core.models import (LoadDeferredTogetherMixin,
+                                      TimeStampModel)
+from authors.apps.core.utils import PROFILE_IMAGE_TRANSFORMATION, cloudinary_url
 from cloudinary.models import CloudinaryField
-from cloudinary import CloudinaryImage
 
 
-class Profile(TimeStampModel):
+class Profile(LoadDeferredTogetherMixin, TimeStampModel):
     user = models.OneToOneField(
         settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     first_name = models.CharField(
@@ -34,9 +35,7 @@ class Profile(TimeStampModel):
         return self.user.username
 
     def get_cloudinary_url(self):
-        image_url = CloudinaryImage(str(self.image)).build_url(
-            width=100, height=150, crop='fill')
-        return image_url
+        return cloudinary_url(self.image, **PROFILE_IMAGE_TRANSFORMATION)
 
 
 """
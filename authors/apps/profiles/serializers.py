@@ -1,8 +1,58 @@
+from django.db.models import Exists, OuterRef
 from rest_framework import serializers
 from .models import Profile
 
 
-class ProfileSerializer(serializers.ModelSerializer):
+def get_following_ids(user):
+    """
+    Return the ids of the profiles `user` follows in a single query.
+    """
+    if user is None or not user.is_authenticated:
+        return set()
+    return set(Profile.objects.filter(
+        followers__user=user).values_list('pk', flat=True))
+
+
+def is_following(user, profile_id):
+    """
+    Return whether `user` follows the profile with `profile_id`.
+    """
+    if user is None or not user.is_authenticated:
+        return False
+    return Profile.objects.filter(
+        pk=profile_id, followers__user=user).exists()
+
+
+def annotate_following(queryset, user, profile_field):
+    """
+    Annotate `queryset` with `following`, whether `user` follows the
+    profile whose id is in `profile_field`, as part of the same query.
+    Anonymous users follow no one, so they get no annotation.
+    """
+    if user is None or not user.is_authenticated:
+        return queryset
+    return queryset.annotate(following=Exists(Profile.objects.filter(
+        pk=OuterRef(profile_field), followers__user=user)))
+
+
+class FollowingFieldMixin:
+    """
+    Answer `following` from the current user's following ids, loaded once
+    and kept in the serializer context. Nested and `many=True` serializers
+    share their root's context, so a whole response costs one query.
+    Views that serialize several payloads can pass the same context dict
+    to each serializer to share the ids between them too.
+    """
+
+    def get_following(self, obj):
+        context = self.context
+        if 'following_ids' not in context:
+            context['following_ids'] = get_following_ids(
+                context.get('current_user', None))
+        return obj.pk in context['following_ids']
+
+
+class ProfileSerializer(FollowingFieldMixin, serializers.ModelSerializer):
     """
     serializers for user profile upon user registration.
     """
@@ -20,12 +70,6 @@ class ProfileSerializer(serializers.ModelSerializer):
 
         read_only_fields = ("created_at", "updated_at")
 
-    def get_following(self, obj):
-        current_user = self.context.get('current_user', None)
-        following = Profile.objects.filter(
-            pk=current_user.pk, followings=obj.pk).exists()
-        return following
-
 
 class MultipleProfileSerializer(serializers.ModelSerializer):
     """
@@ -67,7 +111,8 @@ class FollowUnfollowSerializer(serializers.ModelSerializer):
         return obj.followings.count()
 
 
-class FollowerFollowingSerializer(serializers.ModelSerializer):
+class FollowerFollowingSerializer(FollowingFieldMixin,
+                                  serializers.ModelSerializer):
     """Serializer that return username"""
     username = serializers.ReadOnlyField(source='get_username')
     following = serializers.SerializerMethodField()
@@ -80,9 +125,3 @@ class FollowerFollowingSerializer(serializers.ModelSerializer):
             'last_name', 'bio', 'image_url',
             'city', 'website', 'phone',
             'country', 'following')
-
-    def get_following(self, obj):
-        current_user = self.context.get('current_user', None)
-        following = Profile.objects.filter(
-            pk=current_user.pk, followings=obj.pk).exists()
-        return following
@@ -1,11 +1,18 @@
+from django.db import connection
 from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils.http import http_date
 
 import json
 
+from rest_framework.test import APIClient
+
 from authors.apps.authentication.models import User
+from authors.apps.core.factories import UserFactory
 from authors.apps.profiles.models import Profile
 from authors.apps.profiles.renderers import ProfileJSONRenderer
+from authors.apps.profiles.serializers import ProfileSerializer
 
 
 class TestProfileViews(TestCase):
@@ -285,3 +292,88 @@ class TestProfileViews(TestCase):
         self.assertEqual(response.json()['detail'],
                          "The requested profile does not exist.")
         self.assertEqual(response.status_code, 400)
+
+
+class TestFollowingQueries(TestCase):
+    """The `following` flag must not cost a query per profile."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.reader = UserFactory.create()
+        self.star = UserFactory.create()
+        self.client.force_authenticate(user=self.reader)
+        self.url = reverse("profiles:following",
+                           kwargs={'username': self.star.username})
+
+    def _add_followers(self, count):
+        for _ in range(count):
+            follower = UserFactory.create()
+            follower.profile.followings.add(self.star.profile)
+            self.reader.profile.followings.add(follower.profile)
+
+    def _following_queries(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries), response
+
+    def test_follower_list_query_count_does_not_depend_on_followers(self):
+        self._add_followers(1)
+        one_follower_queries, _ = self._following_queries()
+        self._add_followers(20)
+        many_follower_queries, response = self._following_queries()
+        self.assertEqual(one_follower_queries, many_follower_queries)
+        followers = response.json()['Followers']
+        self.assertEqual(len(followers), 21)
+        self.assertTrue(all(item['following'] for item in followers))
+
+    def test_following_ids_are_loaded_once_per_serializer_tree(self):
+        self._add_followers(3)
+        profiles = Profile.objects.filter(
+            followings=self.star.profile).select_related('user')
+        context = {'current_user': self.reader}
+        with CaptureQueriesContext(connection) as queries:
+            data = ProfileSerializer(profiles, many=True, context=context).data
+            ProfileSerializer(self.star.profile, context=context).data
+        # One query for the profiles and one for the following ids.
+        self.assertEqual(len(queries.captured_queries), 2)
+        self.assertTrue(all(item['following'] for item in data))
+
+
+class TestConditionalProfileGet(TestCase):
+    """Unchanged profiles are answered with `304 Not Modified`."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.reader = UserFactory.create()
+        self.star = UserFactory.create()
+        self.client.force_authenticate(user=self.reader)
+        self.url = reverse("profiles:single-profile",
+                           kwargs={'username': self.star.username})
+
+    def test_unchanged_profile_is_not_modified(self):
+        etag = self.client.get(self.url)['ETag']
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        profile = self.star.profile
+        profile.bio = "A new bio"
+        profile.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['profile']['bio'], "A new bio")
+
+    def test_following_changes_the_etag(self):
+        etag = self.client.get(self.url)['ETag']
+        self.reader.profile.followings.add(self.star.profile)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_following_is_not_answered_from_timestamps(self):
+        self.client.get(self.url)
+        self.reader.profile.followings.add(self.star.profile)
+        response = self.client.get(
+            self.url, HTTP_IF_MODIFIED_SINCE=http_date())
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json()['profile']['following'])
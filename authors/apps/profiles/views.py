@@ -8,6 +8,7 @@ from rest_framework.response import Response
 from drf_yasg.utils import swagger_auto_schema
 
 from .models import Profile
+from ..core.conditional import conditional_get
 from ..authentication.models import User
 from ..articles.models import Article
 from ..articles.serializers import TheArticleSerializer
@@ -15,7 +16,8 @@ from .renderers import ProfileJSONRenderer
 from ..articles.renderers import ArticleJSONRenderer
 from .serializers import (
     ProfileSerializer, MultipleProfileSerializer,
-    FollowUnfollowSerializer, FollowerFollowingSerializer)
+    FollowUnfollowSerializer, FollowerFollowingSerializer,
+    annotate_following)
 from .exceptions import ProfileDoesNotExist
 
 
@@ -29,6 +31,7 @@ class ProfileRetrieveAPIView(RetrieveAPIView):
 
     @swagger_auto_schema(query_serializer=serializer_class,
                          responses={201: serializer_class()})
+    @conditional_get
     def get(self, request, username, *args, **kwargs):
         """ function to retrieve a requested profile """
         try:
@@ -44,6 +47,13 @@ class ProfileRetrieveAPIView(RetrieveAPIView):
 
         return Response(serializer.data, status=status.HTTP_200_OK)
 
+    def get_resource_state(self, request, username, *args, **kwargs):
+        """Return when the profile last changed and whether the viewer
+        follows it, or None when there is no such profile."""
+        profiles = Profile.objects.filter(
+            user__username=username).values('updated_at')
+        return annotate_following(profiles, request.user, 'pk').first()
+
 
 class ProfilesListAPIView(ListAPIView):
     """This class allows authenticated users to get all profiles
@@ -149,8 +159,8 @@ class FollowerFollowingAPIView(ListAPIView):
         except Profile.DoesNotExist:
             raise ProfileDoesNotExist
 
-        followed_friends = user.followings.all()
-        following_friends = user.followers.all()
+        followed_friends = user.followings.select_related('user')
+        following_friends = user.followers.select_related('user')
         return {
             "followed": followed_friends,
             "followers": following_friends
@@ -160,14 +170,17 @@ class FollowerFollowingAPIView(ListAPIView):
         """Returns the user's followed user"""
         following_dict = self.get_queryset(username)
 
+        # Both serializers share one context so the current user's
+        # following ids are loaded only once.
+        context = {'current_user': request.user}
         follower_serializer = FollowerFollowingSerializer(
             following_dict['followed'],
             many=True,
-            context={'current_user': request.user})
+            context=context)
         following_serializer = FollowerFollowingSerializer(
             following_dict['followers'],
             many=True,
-            context={'current_user': request.user})
+            context=context)
 
         message = {
             "message": f"{username}'s statistics:",
@@ -194,8 +207,8 @@ class GetArticlesByAuthor(ListAPIView):
             author = User.objects.get(username=username).profile
         except User.DoesNotExist:
             raise ProfileDoesNotExist
-        published_articles_by_this_author = Article.objects.filter(
-            published=True, activated=True, author=author).all()
+        published_articles_by_this_author = Article.objects.published(
+        ).for_feed().filter(author=author)
         serializer = self.serializer_class(
             published_articles_by_this_author,
             many=True,
@@ -101,6 +101,20 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# PBKDF2 rounds for new password hashes. Stored hashes with other counts
+# are rehashed on login. Hashes are computed in a pool of
+# PASSWORD_HASH_WORKERS processes, or in the request thread with 0.
+PASSWORD_HASH_ITERATIONS = config(
+    'PASSWORD_HASH_ITERATIONS', default=120000, cast=int)
+PASSWORD_HASH_WORKERS = config('PASSWORD_HASH_WORKERS', default=0, cast=int)
+
+PASSWORD_HASHERS = [
+    'authors.apps.authentication.hashers.PolicyPBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+]
+
 # Internationalization
 # https://docs.djangoproject.com/en/1.11/topics/i18n/
 
@@ -151,6 +165,39 @@ CLOUDINARY = {
     'api_secret': config('CLOUDINARY_API_SECRET'),
     'secure': True
 }
+# Size of the in-process cache of built Cloudinary URLs, and an optional
+# Django cache alias shared between workers.
+CLOUDINARY_URL_CACHE_SIZE = config(
+    'CLOUDINARY_URL_CACHE_SIZE', default=4096, cast=int)
+CLOUDINARY_URL_SHARED_CACHE = config('CLOUDINARY_URL_SHARED_CACHE', default='')
+# 'fulltext' ranks article searches with the stored `tsvector` on
+# PostgreSQL, 'trigram' matches substrings instead.
+ARTICLE_SEARCH_MODE = config('ARTICLE_SEARCH_MODE', default='fulltext')
+# Cache alias and lifetime in seconds of cached article payloads.
+ARTICLE_CACHE = config('ARTICLE_CACHE', default='default')
+ARTICLE_CACHE_TIMEOUT = config('ARTICLE_CACHE_TIMEOUT', default=300, cast=int)
+# Number of edit snapshots kept per comment, 0 keeps every one.
+COMMENT_SNAPSHOT_RETENTION = config(
+    'COMMENT_SNAPSHOT_RETENTION', default=50, cast=int)
+# Lifetimes in seconds of access and refresh tokens, and how often each
+# process reads newly revoked access tokens into its denylist.
+JWT_ACCESS_TOKEN_LIFETIME = config(
+    'JWT_ACCESS_TOKEN_LIFETIME', default=900, cast=int)
+JWT_REFRESH_TOKEN_LIFETIME = config(
+    'JWT_REFRESH_TOKEN_LIFETIME', default=30 * 24 * 3600, cast=int)
+JWT_DENYLIST_SYNC_INTERVAL = config(
+    'JWT_DENYLIST_SYNC_INTERVAL', default=5, cast=int)
+# Lifetime in seconds of password reset tokens, matching the expiry of
+# the link emailed to users.
+PASSWORD_RESET_TOKEN_LIFETIME = config(
+    'PASSWORD_RESET_TOKEN_LIFETIME', default=12 * 3600, cast=int)
+# Cache alias for the user state JWT authentication checks, '' queries the
+# user on every request. Entries live for the timeout in seconds there and
+# for the shorter local timeout in each process.
+JWT_USER_CACHE = config('JWT_USER_CACHE', default='')
+JWT_USER_CACHE_TIMEOUT = config('JWT_USER_CACHE_TIMEOUT', default=60, cast=int)
+JWT_USER_LOCAL_CACHE_TIMEOUT = config(
+    'JWT_USER_LOCAL_CACHE_TIMEOUT', default=5, cast=int)
 
 SOCIAL_AUTH_GOOGLE_OAUTH2_KEY = config('SOCIAL_AUTH_GOOGLE_OAUTH2_KEY')
 SOCIAL_AUTH_GOOGLE_OAUTH2_SECRET = config('SOCIAL_AUTH_GOOGLE_OAUTH2_SECRET')
@@ -200,4 +247,10 @@ EMAIL_HOST_USER = config('EMAIL_HOST_USER', default='')
 EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD', default='')
 EMAIL_PORT = config('EMAIL_PORT', default=587, cast=int)
 EMAIL_USE_TLS = config('EMAIL_USE_TLS', default=True, cast=bool)
-FROM_EMAIL = config('EMAIL_FROM', default='verify@authorsheaven.com')
\ No newline at end of file
+FROM_EMAIL = config('EMAIL_FROM', default='verify@authorsheaven.com')
+# Attempts at sending a queued email, and the delay in seconds before the
+# first retry, which doubles after each further failure.
+EMAIL_OUTBOX_MAX_ATTEMPTS = config(
+    'EMAIL_OUTBOX_MAX_ATTEMPTS', default=5, cast=int)
+EMAIL_OUTBOX_RETRY_DELAY = config(
+    'EMAIL_OUTBOX_RETRY_DELAY', default=60, cast=int)
\ No newline at end of file